@@ -0,0 +1,355 @@
+"""
+bitmap_sources.py, by John Michael Jarvis JMJarvis1@icloud.com
+Loads the bitmaps used by bitmapmessage.py from files.
+
+A source reads a file into a Raster: the ink of each pixel, from 0 (blank) to
+1 (solid). Text art (.txt) has a solid cell for every non-space character, and
+PBM and PGM images (.pbm, .pgm, .pnm) are read in their plain or raw form, raw
+images being mapped from disk rather than read into memory. Other formats can
+be added with `register_source`.
+
+The raster is downscaled to a width in terminal cells, a band of rows at a
+time, and compiled to the runs of solid cells on each line. The runs are
+cached on disk under the hash of the file's contents, so a bitmap is only
+read and scaled again when the file or the width changes.
+"""
+
+import hashlib
+import logging
+import os
+from collections.abc import Callable, Iterator
+from itertools import pairwise
+
+import numpy as np
+
+CACHE_DIR: str = os.path.join(os.path.expanduser("~"), ".cache", "bitmapmessage")
+CACHE_VERSION: int = 1  # Changed whenever the compiled form changes
+THRESHOLD: float = 0.5  # Ink a cell needs to be solid
+BLOCK_PIXELS: int = 1 << 22  # Pixels read from a raster at a time
+HASH_BLOCK: int = 1 << 20  # Bytes hashed at a time
+CELL_ASPECT: float = 2.0  # Height of a terminal cell over its width
+
+Runs = list[list[tuple[int, int]]]  # Start and end of each run, by line
+
+
+class Raster:
+    """
+    The ink of each pixel of a bitmap, read a band of rows at a time.
+    """
+
+    __slots__ = ("height", "width", "aspect", "_pixels", "_ink")
+
+    def __init__(
+        self,
+        pixels: np.ndarray,
+        width: int,
+        ink: Callable[[np.ndarray], np.ndarray],
+        aspect: float,
+    ) -> None:
+        """
+        :param pixels: The pixels, one row per line. May be a memory map.
+        :type pixels: np.ndarray
+        :param width: Width of the bitmap, in pixels.
+        :type width: int
+        :param ink: Converts rows of pixels to the ink of each pixel.
+        :type ink: Callable[[np.ndarray], np.ndarray]
+        :param aspect: How many pixels tall a cell is, for a cell one pixel
+            wide. 1.0 for text art, CELL_ASPECT for images.
+        :type aspect: float
+        """
+        self.height: int = len(pixels)
+        self.width: int = width
+        self.aspect: float = aspect
+        self._pixels: np.ndarray = pixels
+        self._ink: Callable[[np.ndarray], np.ndarray] = ink
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        """
+        :return: The ink of each pixel of the rows from start up to stop.
+        :rtype: np.ndarray
+        """
+        return self._ink(self._pixels[start:stop])
+
+
+def load_text_art(path: str) -> Raster:
+    """
+    Reads text art, in which every character other than a space is solid.
+
+    :param path: Path to the file.
+    :type path: str
+    :return: The raster, one pixel per character.
+    :rtype: Raster
+    """
+    with open(file=path, mode="r", encoding="UTF-8") as read_file:
+        lines: list[str] = read_file.read().splitlines()
+
+    width: int = max(map(len, lines), default=0)
+    pixels: np.ndarray = np.zeros((len(lines), width), dtype=bool)
+    for row, line in enumerate(lines):
+        pixels[row, : len(line)] = np.frombuffer(
+            line.encode("UTF-32-LE"), dtype=np.uint32
+        ) != ord(" ")
+
+    return Raster(pixels, width, lambda rows: rows.astype(np.float32), 1.0)
+
+
+def load_netpbm(path: str) -> Raster:
+    """
+    Reads a PBM or PGM image, plain (P1, P2) or raw (P4, P5). Black pixels are
+    solid, and grey pixels partly so.
+
+    :param path: Path to the file.
+    :type path: str
+    :raises ValueError: Raised if the file is not a PBM or PGM image.
+    :return: The raster.
+    :rtype: Raster
+    """
+    with open(file=path, mode="rb") as read_file:
+        magic, sizes, offset = _read_header(read_file)
+    width, height = sizes[0], sizes[1]
+    maxval: int = sizes[2] if magic in (b"P2", b"P5") else 1
+    if min(width, height, maxval) < 1 or maxval > 0xFFFF:
+        raise ValueError("An error occurred", "ValueError", f"path = {path}")
+
+    if magic == b"P4":
+        pixels: np.ndarray = np.memmap(
+            path,
+            dtype=np.uint8,
+            mode="r",
+            offset=offset,
+            shape=(height, -(-width // 8)),
+        )
+        return Raster(
+            pixels,
+            width,
+            lambda rows: np.unpackbits(rows, axis=1)[:, :width].astype(np.float32),
+            CELL_ASPECT,
+        )
+
+    if magic == b"P5":
+        pixels = np.memmap(
+            path,
+            dtype=np.uint8 if maxval < 256 else ">u2",
+            mode="r",
+            offset=offset,
+            shape=(height, width),
+        )
+    else:
+        with open(file=path, mode="rb") as read_file:
+            read_file.seek(offset)
+            data: bytes = b"\n".join(
+                line.split(b"#", 1)[0] for line in read_file.read().splitlines()
+            )
+        if magic == b"P1":
+            data = bytes(byte for byte in data if byte in b"01")
+            values: np.ndarray = np.frombuffer(data, dtype=np.uint8) - ord("0")
+        else:
+            values = np.array(data.split(), dtype=np.int64)
+        if len(values) < width * height:
+            raise ValueError("An error occurred", "ValueError", f"path = {path}")
+        pixels = values[: width * height].reshape(height, width)
+
+    if magic in (b"P1", b"P4"):
+        return Raster(pixels, width, lambda rows: rows.astype(np.float32), CELL_ASPECT)
+
+    return Raster(
+        pixels,
+        width,
+        lambda rows: 1 - rows.astype(np.float32) / maxval,
+        CELL_ASPECT,
+    )
+
+
+def _read_header(read_file) -> tuple[bytes, list[int], int]:
+    """
+    Reads the header of a PBM or PGM image.
+
+    :return: The magic number, the sizes (width, height and maxval, if any)
+        and the position of the pixels in the file.
+    :rtype: tuple[bytes, list[int], int]
+    """
+    magic: bytes = read_file.read(2)
+    if magic not in (b"P1", b"P2", b"P4", b"P5"):
+        raise ValueError("An error occurred", "ValueError", f"magic = {magic}")
+
+    sizes: list[int] = []
+    token: bytes = b""
+    while len(sizes) < (2 if magic in (b"P1", b"P4") else 3):
+        byte: bytes = read_file.read(1)
+        if byte == b"#":
+            read_file.readline()
+        elif byte.isdigit():
+            token += byte
+            continue
+        elif byte == b"" or not byte.isspace():
+            raise ValueError("An error occurred", "ValueError", f"byte = {byte}")
+        if token:
+            sizes.append(int(token))
+            token = b""
+
+    return magic, sizes, read_file.tell()
+
+
+SOURCES: dict[str, Callable[[str], Raster]] = {
+    ".txt": load_text_art,
+    ".pbm": load_netpbm,
+    ".pgm": load_netpbm,
+    ".pnm": load_netpbm,
+}
+
+
+def register_source(extension: str, loader: Callable[[str], Raster]) -> None:
+    """
+    Adds a loader for the files with an extension, i.e. '.xbm'.
+
+    :param extension: The extension, including the dot.
+    :type extension: str
+    :param loader: Reads a file of the format into a Raster.
+    :type loader: Callable[[str], Raster]
+    """
+    SOURCES[extension.lower()] = loader
+
+
+def downscale(
+    raster: Raster, width: int, threshold: float = THRESHOLD
+) -> Iterator[np.ndarray]:
+    """
+    Scales a raster down to a width in terminal cells, keeping its proportions.
+    Each cell is solid if the pixels it covers have enough ink on average.
+    Rasters narrower than the width are not scaled up.
+
+    :param raster: The raster.
+    :type raster: Raster
+    :param width: Largest width, in cells.
+    :type width: int
+    :param threshold: Ink a cell needs to be solid, defaults to THRESHOLD
+    :type threshold: float, optional
+    :return: The cells of each line, True if solid.
+    :rtype: Iterator[np.ndarray]
+    """
+    if raster.width == 0 or raster.height == 0:
+        yield from (np.zeros(0, dtype=bool) for row in range(raster.height))
+        return
+
+    columns: int = min(width, raster.width)
+    lines: int = max(1, round(raster.height * columns / raster.width / raster.aspect))
+    lines = min(lines, raster.height)
+    col_starts: np.ndarray = np.arange(columns) * raster.width // columns
+    col_sizes: np.ndarray = np.diff(col_starts, append=raster.width)
+    band_rows: int = max(1, BLOCK_PIXELS // raster.width)
+
+    for line in range(lines):
+        start: int = line * raster.height // lines
+        stop: int = (line + 1) * raster.height // lines
+        ink: np.ndarray = np.zeros(raster.width, dtype=np.float64)
+        for band in range(start, stop, band_rows):
+            ink += raster.rows(band, min(band + band_rows, stop)).sum(axis=0)
+        cells: np.ndarray = np.add.reduceat(ink, col_starts)
+        yield cells >= threshold * col_sizes * (stop - start)
+
+
+def compile_runs(
+    raster: Raster, width: int, threshold: float = THRESHOLD
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Downscales a raster and finds the runs of solid cells on each line.
+
+    :return: The start and end of every run, and the index of the first run
+        of each line followed by the number of runs.
+    :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    starts: list[np.ndarray] = []
+    ends: list[np.ndarray] = []
+    offsets: list[int] = [0]
+    for cells in downscale(raster, width, threshold):
+        edges: np.ndarray = np.flatnonzero(
+            np.diff(cells.astype(np.int8), prepend=0, append=0)
+        )
+        starts.append(edges[0::2])
+        ends.append(edges[1::2])
+        offsets.append(offsets[-1] + len(edges) // 2)
+
+    return (
+        np.concatenate(starts or [np.zeros(0)]).astype(np.int32),
+        np.concatenate(ends or [np.zeros(0)]).astype(np.int32),
+        np.array(offsets, dtype=np.int64),
+    )
+
+
+def load_runs(
+    path: str,
+    width: int,
+    threshold: float = THRESHOLD,
+    cache_dir: str | None = CACHE_DIR,
+) -> Runs:
+    """
+    Loads a bitmap file as the runs of solid cells on each line, from the
+    cache if the file has been compiled for the width before.
+
+    :param path: Path to the file.
+    :type path: str
+    :param width: Largest width, in cells.
+    :type width: int
+    :param threshold: Ink a cell needs to be solid, defaults to THRESHOLD
+    :type threshold: float, optional
+    :param cache_dir: Directory of the cache, or None to skip it, defaults to CACHE_DIR
+    :type cache_dir: str | None, optional
+    :raises ValueError: Raised if there is no source for the file's extension.
+    :return: The start and end of each run, by line.
+    :rtype: Runs
+    """
+    extension: str = os.path.splitext(path)[1].lower()
+    if extension not in SOURCES:
+        raise ValueError("An error occurred", "ValueError", f"path = {path}")
+
+    cache_path: str | None = None
+    compiled: tuple[np.ndarray, ...] | None = None
+    if cache_dir is not None:
+        key: str = _content_hash(
+            path, f"{CACHE_VERSION}:{extension}:{width}:{threshold}"
+        )
+        cache_path = os.path.join(cache_dir, f"{key}.npz")
+        try:
+            with np.load(cache_path) as data:
+                compiled = (data["starts"], data["ends"], data["offsets"])
+        except (OSError, ValueError, KeyError):
+            compiled = None
+
+    if compiled is None:
+        compiled = compile_runs(SOURCES[extension](path), width, threshold)
+        if cache_path is not None:
+            _save(cache_path, *compiled)
+
+    starts, ends, offsets = (array.tolist() for array in compiled)
+    return [
+        list(zip(starts[first:last], ends[first:last]))
+        for first, last in pairwise(offsets)
+    ]
+
+
+def _content_hash(path: str, salt: str) -> str:
+    """
+    Hashes the contents of a file along with the settings it is compiled with.
+    """
+    digest = hashlib.sha256(salt.encode())
+    with open(file=path, mode="rb") as read_file:
+        while block := read_file.read(HASH_BLOCK):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _save(
+    cache_path: str, starts: np.ndarray, ends: np.ndarray, offsets: np.ndarray
+) -> None:
+    """
+    Writes compiled runs to the cache. A cache that cannot be written is skipped.
+    """
+    temp_path: str = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(file=temp_path, mode="wb") as write_file:
+            np.savez(write_file, starts=starts, ends=ends, offsets=offsets)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        logging.error(f" An error occurred when attempting to save '{cache_path}'.")
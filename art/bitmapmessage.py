@@ -1,17 +1,46 @@
 """
 bitmapmessage.py,
-maps a user provided message to a bitmap"""
+maps a user provided message to a bitmap
 
+The bitmap is compiled once into a Mask: the runs of non-space cells on each
+line. A message is rendered by repeating it across the width of the bitmap
+and copying the slice under each run, and the whole image is built as one
+string and written to the screen at once.
+
+The world map is used unless another bitmap is given with --bitmap, which is
+loaded through bitmap_sources.py and scaled to fit --width.
+
+With --batch, messages are read one per line from a file or stdin instead and
+rendered one after another against the same Mask. They are rendered in chunks,
+which can be spread over worker processes, and written in their input order.
+
+With --animate, the message scrolls through the bitmap instead, one cell per
+frame. The image is drawn once, and each frame after that only rewrites the
+cells that change, moving the cursor to them with ANSI escape codes."""
+
+import argparse
+import itertools
 import os
+import re
+import shutil
 import sys
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TextIO
 
-sys.path.append(os.getcwd() + "/..")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from bitmap_sources import SOURCES, Runs, load_runs
 from common_functions import clear_scrn
 
+CHUNK_SIZE: int = 256  # Messages rendered per task in batch mode
+FPS: float = 20.0  # Frames per second of an animation
+MAX_GAP: int = 6  # Unchanged cells rewritten rather than moving the cursor past
+CHANGES_PATTERN: re.Pattern = re.compile(f"1(?:0{{0,{MAX_GAP}}}1)*")
 
-def main():
-    bitmap = """
+BITMAP: str = """
 ....................................................................
    **************   *  *** **  *      ******************************
   ********************* ** ** *  * ****************************** *
@@ -33,6 +62,28 @@ def main():
                     ***                                       *    *
                     **     *                    *
 ...................................................................."""
+
+
+def main():
+    args: argparse.Namespace = parse_args()
+
+    mask: Mask = (
+        Mask(BITMAP)
+        if args.bitmap is None
+        else Mask.from_runs(load_runs(args.bitmap, args.width))
+    )
+
+    if args.batch is not None:
+        if args.batch == "-":
+            render_stream(sys.stdin, sys.stdout, mask, args.workers, args.chunk_size)
+        else:
+            with open(file=args.batch, mode="r", encoding="UTF-8") as read_file:
+                render_stream(
+                    read_file, sys.stdout, mask, args.workers, args.chunk_size
+                )
+        sys.stdout.flush()
+        return
+
     clear_scrn()
 
     prompt = "Enter a message below, and I'll map it to a bitmap image."
@@ -48,15 +99,404 @@ def main():
     if message == "":
         sys.exit()  # End progam if user does not enter a message.
 
-    for line in bitmap.splitlines():
-        for index, bit in enumerate(line):
-            if bit == " ":
-                print(" ", end="")  # print blank space in blank space
+    if args.animate:
+        fps: float = animate(mask, message, args.fps, args.frames)
+        print(f"Average of {fps:.1f} frames per second.")
+        return
+
+    sys.stdout.write(render(mask, message))
+    sys.stdout.flush()
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Maps messages to a bitmap image.")
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="Render each line of FILE (default: stdin) instead of asking.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes for --batch."
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help="Messages rendered per task for --batch.",
+    )
+    parser.add_argument(
+        "--bitmap",
+        default=None,
+        metavar="FILE",
+        help=f"Bitmap to use instead of the world map ({', '.join(sorted(SOURCES))}).",
+    )
+    parser.add_argument(
+        "--width",
+        type=int,
+        default=shutil.get_terminal_size().columns,
+        help="Width to scale --bitmap down to (default: the terminal's width).",
+    )
+    parser.add_argument(
+        "--animate",
+        action="store_true",
+        help="Scroll the message through the bitmap until interrupted.",
+    )
+    parser.add_argument(
+        "--fps", type=float, default=FPS, help="Frames per second for --animate."
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=None,
+        help="Stop --animate after this many frames.",
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.animate and args.batch is not None:
+        parser.error("--animate cannot be used with --batch")
+    if args.fps <= 0:
+        parser.error("--fps must be greater than 0")
+    if args.frames is not None and args.frames < 1:
+        parser.error("--frames must be at least 1")
+    if args.bitmap is not None:
+        if not os.path.isfile(args.bitmap):
+            parser.error(f"--bitmap {args.bitmap!r} is not a file")
+        if os.path.splitext(args.bitmap)[1].lower() not in SOURCES:
+            parser.error(f"--bitmap {args.bitmap!r} is not a supported format")
+    if args.width < 1:
+        parser.error("--width must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    return args
+
+
+class Mask:
+    """
+    A bitmap compiled for rendering. Each line is kept as its runs of non-space
+    cells, each with the spaces before it, and the spaces after the last run.
+    """
+
+    __slots__ = ("lines", "width")
+
+    def __init__(self, bitmap: str = "") -> None:
+        """
+        :param bitmap: The bitmap, with a space for each blank cell, defaults to ""
+        :type bitmap: str, optional
+        """
+        self.lines: list[tuple[list[tuple[str, int, int]], str]] = []
+        self.width: int = 0
+
+        for line in bitmap.splitlines():
+            self._add_line(_find_runs(line), len(line))
+
+    @classmethod
+    def from_runs(cls, lines: Runs) -> "Mask":
+        """
+        Compiles a bitmap given as the runs of non-space cells on each line,
+        such as one loaded by `bitmap_sources.load_runs`.
+
+        :param lines: The start and end index of each run, by line.
+        :type lines: Runs
+        :return: The compiled bitmap.
+        :rtype: Mask
+        """
+        mask: Mask = cls()
+        for runs in lines:
+            mask._add_line(runs, runs[-1][1] if runs else 0)
+
+        return mask
+
+    def _add_line(self, runs: list[tuple[int, int]], length: int) -> None:
+        """
+        Adds a line of a given length with runs of non-space cells.
+        """
+        spaced: list[tuple[str, int, int]] = []
+        position: int = 0
+        for start, end in runs:
+            spaced.append((" " * (start - position), start, end))
+            position = end
+        self.lines.append((spaced, " " * (length - position)))
+        self.width = max(self.width, length)
+
+
+def _find_runs(line: str) -> list[tuple[int, int]]:
+    """
+    Finds the runs of non-space cells in a line.
+
+    :param line: A line of the bitmap.
+    :type line: str
+    :return: The start and end index of each run.
+    :rtype: list[tuple[int, int]]
+    """
+    runs: list[tuple[int, int]] = []
+    start: int | None = None
+    for index, bit in enumerate(line + " "):
+        if bit != " " and start is None:
+            start = index
+        elif bit == " " and start is not None:
+            runs.append((start, index))
+            start = None
+
+    return runs
+
+
+def render(mask: Mask, message: str) -> str:
+    """
+    Maps a message onto a bitmap. The cell at index i of each line shows
+    character i % len(message) of the message.
+
+    :param mask: The compiled bitmap.
+    :type mask: Mask
+    :param message: The message, at least one character long.
+    :type message: str
+    :return: The image, ending with an empty line.
+    :rtype: str
+    """
+    tiled: str = message * (mask.width // len(message) + 1)
+    parts: list[str] = []
+    for runs, trailing in mask.lines:
+        for spaces, start, end in runs:
+            parts.append(spaces)
+            parts.append(tiled[start:end])
+        parts.append(trailing)
+        parts.append("\n")
+    parts.append("\n")
+
+    return "".join(parts)
+
+
+def render_stream(
+    lines: Iterable[str],
+    out: TextIO,
+    mask: Mask,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """
+    Renders a message for each line read, in order. Blank lines are skipped.
+    Only a few chunks are held at a time, so the lines may come from a stream.
+
+    :param lines: The messages, one per line.
+    :type lines: Iterable[str]
+    :param out: Where to write the images.
+    :type out: TextIO
+    :param mask: The compiled bitmap.
+    :type mask: Mask
+    :param workers: Number of worker processes, defaults to 1
+    :type workers: int, optional
+    :param chunk_size: Messages rendered per task, defaults to CHUNK_SIZE
+    :type chunk_size: int, optional
+    :return: The number of messages rendered.
+    :rtype: int
+    """
+    count: int = 0
+    chunks: Iterator[list[str]] = _chunk_messages(lines, chunk_size)
+
+    if workers > 1:
+        with ProcessPoolExecutor(
+            workers, initializer=_set_mask, initargs=(mask,)
+        ) as pool:
+            pending: deque[tuple[int, Future]] = deque()
+            for chunk in chunks:
+                pending.append((len(chunk), pool.submit(_render_chunk, chunk)))
+                if len(pending) > 2 * workers:
+                    size, future = pending.popleft()
+                    out.write(future.result())
+                    count += size
+            for size, future in pending:
+                out.write(future.result())
+                count += size
+    else:
+        for chunk in chunks:
+            out.write("".join(render(mask, message) for message in chunk))
+            count += len(chunk)
+
+    return count
+
+
+def _chunk_messages(lines: Iterable[str], chunk_size: int) -> Iterator[list[str]]:
+    """
+    Groups the non-blank lines read into chunks, without their line endings.
+    """
+    messages: Iterator[str] = (line.rstrip("\r\n") for line in lines)
+    messages = (message for message in messages if message)
+    while chunk := list(itertools.islice(messages, chunk_size)):
+        yield chunk
+
+
+_worker_mask: Mask | None = None  # The Mask of a worker process
+
+
+def _set_mask(mask: Mask) -> None:
+    """
+    Keeps the Mask in a worker process. Executed once in each worker.
+    """
+    global _worker_mask
+    _worker_mask = mask
+
+
+def _render_chunk(messages: list[str]) -> str:
+    """
+    Renders a chunk of messages. Executed in the worker processes.
+
+    :param messages: The messages.
+    :type messages: list[str]
+    :return: The images, one after another.
+    :rtype: str
+    """
+    return "".join(render(_worker_mask, message) for message in messages)
+
+
+class Scroller:
+    """
+    The frames of a message scrolling through a bitmap. At phase p, the cell at
+    index i of each line shows character (i + p) % len(message) of the message.
+    """
+
+    __slots__ = ("mask", "message", "_tiled", "_changed")
+
+    def __init__(self, mask: Mask, message: str) -> None:
+        """
+        :param mask: The compiled bitmap.
+        :type mask: Mask
+        :param message: The message, at least one character long.
+        :type message: str
+        """
+        self.mask: Mask = mask
+        self.message: str = message
+
+        # A cell changes from one phase to the next where the character it
+        # shows differs from the one before it in the message.
+        repeats: int = mask.width // len(message) + 2
+        changed: str = "".join(
+            "0" if char == message[index - 1] else "1"
+            for index, char in enumerate(message)
+        )
+        self._tiled: str = message * repeats
+        self._changed: str = changed * repeats
+
+    def frame(self, phase: int) -> str:
+        """
+        :return: The whole image at a phase, as `render` draws it.
+        :rtype: str
+        """
+        shift: int = phase % len(self.message)
+        return render(self.mask, self.message[shift:] + self.message[:shift])
+
+    def update(self, phase: int, top: int = 1) -> str:
+        """
+        Returns the ANSI escape codes and text that turn the image at the phase
+        before into the image at a phase. Changes a few cells apart are written
+        together, rewriting the cells between them, and a line with many
+        changes is rewritten whole.
+
+        :param phase: The phase to update to.
+        :type phase: int
+        :param top: Screen row of the first line of the image, defaults to 1
+        :type top: int, optional
+        :return: The update.
+        :rtype: str
+        """
+        shift: int = phase % len(self.message)
+        parts: list[str] = []
+        for row, (runs, trailing) in enumerate(self.mask.lines, start=top):
+            if not runs:
+                continue
+            changes: list[str] = []
+            for spaces, start, end in runs:
+                for match in CHANGES_PATTERN.finditer(
+                    self._changed, start + shift, end + shift
+                ):
+                    changes.append(f"\x1b[{row};{match.start() - shift + 1}H")
+                    changes.append(self._tiled[match.start() : match.end()])
+
+            # Rewrite the whole line instead if that is shorter.
+            line: list[str] = [f"\x1b[{row};{runs[0][1] + 1}H"]
+            for index, (spaces, start, end) in enumerate(runs):
+                if index:
+                    line.append(spaces)
+                line.append(self._tiled[start + shift : end + shift])
+            if sum(map(len, line)) < sum(map(len, changes)):
+                changes = line
+            parts.extend(changes)
+
+        return "".join(parts)
+
+
+def animate(
+    mask: Mask, message: str, fps: float = FPS, frames: int | None = None
+) -> float:
+    """
+    Scrolls a message through a bitmap on the screen until interrupted or a
+    number of frames have been shown. The frames per second measured over the
+    last second are shown below the image. Frames that are late are not made
+    up for, so a slow terminal lowers the frame rate rather than falling behind.
+
+    :param mask: The compiled bitmap.
+    :type mask: Mask
+    :param message: The message, at least one character long.
+    :type message: str
+    :param fps: Frames per second to aim for, defaults to FPS
+    :type fps: float, optional
+    :param frames: Number of frames to show, defaults to None (until interrupted)
+    :type frames: int | None, optional
+    :return: The average frames per second.
+    :rtype: float
+    """
+    scroller: Scroller = Scroller(mask, message)
+    status_row: int = len(mask.lines) + 1
+    interval: float = 1 / fps
+
+    # Clear the screen, hide the cursor and draw the first frame.
+    sys.stdout.write("\x1b[H\x1b[2J\x1b[?25l" + scroller.frame(0))
+    sys.stdout.flush()
+
+    start: float = time.perf_counter()
+    deadline: float = start
+    counted_since: float = start
+    counted: int = 0
+    phase: int = 0
+    try:
+        while frames is None or phase + 1 < frames:
+            deadline += interval
+            delay: float = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
             else:
-                # Print one character from message each loop
-                print(message[index % len(message)], end="")
-        print()
-    print()
+                deadline = time.perf_counter()  # Late, so start again from now
+
+            phase += 1
+            counted += 1
+            update: str = scroller.update(phase)
+            now: float = time.perf_counter()
+            if now - counted_since >= 1:
+                update += (
+                    f"\x1b[{status_row};1H{counted / (now - counted_since):.1f} "
+                    f"fps (target {fps:g})\x1b[K"
+                )
+                counted_since, counted = now, 0
+            sys.stdout.write(update)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sys.stdout.write(f"\x1b[{status_row + 1};1H\x1b[?25h")
+        sys.stdout.flush()
+
+    elapsed: float = time.perf_counter() - start
+    return phase / elapsed if elapsed > 0 else 0.0
 
 
 if __name__ == "__main__":
@@ -20,17 +20,41 @@ def display_message(
     :type txt_width: int, optional
 
     """
-    if isinstance(message, list):
-        for line in message:
-            if len(line) > txt_width:
-                _print_long_message(line, txt_width)
-            else:
-                line = justify_txt(line, msg_just, txt_width)
-                print(line)
-    elif isinstance(message, str) & (len(message) > txt_width):
-        _print_long_message(message, txt_width)
-    else:
-        print(message)
+    for line in format_message(message, txt_width, msg_just):
+        print(line)
+
+
+def format_message(
+    message: list[str] | str,
+    txt_width: int = 80,
+    msg_just: Literal["ljust", "rjust", "center"] = "ljust",
+) -> list[str]:
+    """
+    Formats text into the lines shown by `display_message`. Long lines are
+    wrapped to the width and other lines of a list are justified.
+
+    :param message: The text to be formatted.
+    :type message: list[str] | str
+    :param txt_width: width of the text, defaults to 80
+    :type txt_width: int, optional
+    :param msg_just: Justification of the lines, defaults to "ljust"
+    :type msg_just: Literal["ljust", "rjust", "center"], optional
+    :return: The lines of text.
+    :rtype: list[str]
+    """
+    if isinstance(message, str):
+        return (
+            textwrap.wrap(message, txt_width) if len(message) > txt_width else [message]
+        )
+
+    lines: list[str] = []
+    for line in message:
+        if len(line) > txt_width:
+            lines.extend(textwrap.wrap(line, txt_width))
+        else:
+            lines.append(justify_txt(line, msg_just, txt_width))
+
+    return lines
 
 
 def justify_txt(msg: str, msg_just: str, width: int, fillchar: str = " ") -> str:
@@ -43,19 +67,6 @@ def justify_txt(msg: str, msg_just: str, width: int, fillchar: str = " ") -> str
             return msg.ljust(width, fillchar)
 
 
-def _print_long_message(message: str, txt_width: int = 80) -> None:
-    """
-    Displays text wrapped to a desired width.
-
-    :param message: String to be displayed
-    :type message: str
-    :param txt_width: Width tet will be wrapped to.
-    :type txt_width: int
-    """
-    long_msg: list = textwrap.wrap(message, txt_width)
-    [print(line) for line in long_msg]
-
-
 def month_end_date(month: int) -> int:
     """
     Returns the last day of a given month as an integer value.
@@ -1,26 +1,44 @@
-"""Bagels v1.0 - A deductive reasoning game where the player is asked to guess a number of a set length using the clues provided following each incorrect guess. The player wins if they guess correctly before running out of guesses"""
+"""Bagels v1.0 - A deductive reasoning game where the player is asked to guess a number of a set length using the clues provided following each incorrect guess. The player wins if they guess correctly before running out of guesses
 
+The length of the secret number and the base its digits are drawn from can be
+changed with --digits and --base (up to 36, using the letters a-z as digits
+past 9), as long as there are enough digits for the number to have no repeats.
+
+Clues are scored without scanning strings. Each number is encoded once as a
+mask with bit d set for each digit d it holds and an integer holding each
+digit in a FIELD_BITS wide field, so that the digits in common are the set
+bits of an AND of the masks and the Fermis are the empty fields of an XOR of
+the packed integers. `score_many` scores one guess against many encoded
+numbers, and only `get_clue` shuffles the clue words for display."""
+
+import argparse
 import sys
 import os
 import random
 import logging
+from functools import lru_cache
 
 
-sys.path.append(os.getcwd() + "/..")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from common_functions import clear_scrn
 
 MAX_GUESSES: int = 10  # Number of guesses available to the player
 NUM_DIGITS: int = 3  # Length of the secret number
+BASE: int = 10  # Number of different digits
+DIGITS: str = "0123456789abcdefghijklmnopqrstuvwxyz"  # Digits of each base
+FIELD_BITS: int = 6  # Width of each digit's field in a packed number
 
 
 def main() -> None:
+    args: argparse.Namespace = parse_args()
+
     while True:  # Main game loop.
         # Print title and game instructions
-        print_intro()
+        print_intro(args.digits, args.base)
 
         # Get secret number
-        secret_nums: list = get_secret_num()
+        secret_nums: list = get_secret_num(args.digits, args.base)
 
         # Get player guess
         guess_count: int = 1
@@ -28,9 +46,9 @@ def main() -> None:
         while guess_count <= MAX_GUESSES:
             print(f"Guess #{guess_count}")
 
-            guess: str = input("> ")  # Player input
+            guess: str = input("> ").lower()  # Player input
 
-            if not validate_guess(guess):
+            if not validate_guess(guess, args.digits, args.base):
                 continue
 
             guess_count += 1
@@ -59,7 +77,31 @@ def main() -> None:
     sys.exit()
 
 
-def print_intro() -> None:
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Bagels, a deductive logic game.")
+    parser.add_argument(
+        "--digits", type=int, default=NUM_DIGITS, help="Length of the secret number."
+    )
+    parser.add_argument(
+        "--base", type=int, default=BASE, help="Number of different digits (2-36)."
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.base not in range(2, len(DIGITS) + 1):
+        parser.error(f"--base must be between 2 and {len(DIGITS)}")
+    if args.digits not in range(1, args.base + 1):
+        parser.error("--digits must be between 1 and --base")
+
+    return args
+
+
+def print_intro(num_digits: int = NUM_DIGITS, base: int = BASE) -> None:
     clear_scrn()
 
     title_msg: str = "Bagels"
@@ -67,8 +109,8 @@ def print_intro() -> None:
     instruction_msg: str = f"""
         Instructions:
           
-            I have created a secret number that is comprised of {NUM_DIGITS}
-            unique digits. 
+            I have created a secret number that is comprised of {num_digits}
+            unique digits from {DIGITS[:base]}. 
             
             You will have {MAX_GUESSES} chances to guess this number
             correctly. 
@@ -97,47 +139,119 @@ def print_intro() -> None:
     print(title_msg.center(79), "\n", instruction_msg)
 
 
-def get_secret_num() -> list[str]:
-    nums: list[int] = [num for num in range(10)]
-
-    random.shuffle(nums)
+def get_secret_num(num_digits: int = NUM_DIGITS, base: int = BASE) -> list[str]:
     try:
-        sampled_nums: list[int] = random.sample(nums, NUM_DIGITS)
+        sampled_nums: list[str] = random.sample(DIGITS[:base], num_digits)
     except ValueError as e:
         logging.exception(f"\nA ValueError occurred: {e}")
         sys.exit()
 
-    return [str(num) for num in sampled_nums]
+    return sampled_nums
 
 
-def validate_guess(guess) -> bool:
+def validate_guess(guess, num_digits: int = NUM_DIGITS, base: int = BASE) -> bool:
     "Check if player's guess meets game requirements."
-    try:
-        int(guess)
-        if len(set(guess)) == NUM_DIGITS:  # Check for length and unique digits
-            return True
-    except ValueError as e:  # Handle non-integer exceptions
-        logging.exception(f"A ValueError has occurred: {e}")
+    # Only digits of the base, so no signs, underscores or spaces
+    if not set(guess) <= set(DIGITS[:base]):
+        logging.error(f"A ValueError has occurred: {guess!r} is not in base {base}")
+        return False
 
-    return False
+    # Check for length and unique digits
+    return len(guess) == len(set(guess)) == num_digits
 
 
-def get_clue(guess, secret_num) -> str:
-    clues: list[str] = []
-
-    for i in range(NUM_DIGITS):
-        if guess[i] == secret_num[i]:
-            clues.append("Fermi")
-        elif guess[i] in secret_num:
-            clues.append("Pico")
+def get_clue(guess, secret_num, rng: random.Random | None = None) -> str:
+    "Score a guess, with the clue words shuffled by rng (or the random module)."
+    fermi, pico = score(encode(guess), encode(secret_num))
+    clues: list[str] = ["Fermi"] * fermi + ["Pico"] * pico
 
     if len(clues) == 0:
         return "Bagels"
     else:
-        random.shuffle(clues)
+        (random if rng is None else rng).shuffle(clues)
         return " ".join(clues)
 
 
+def encode(number) -> tuple[int, int]:
+    """
+    Encodes a number for scoring.
+
+    :param number: The number, as a string or list of digits.
+    :type number: str | list[str]
+    :return: Its digit mask and packed digits.
+    :rtype: tuple[int, int]
+    """
+    mask: int = 0
+    packed: int = 0
+    for position, digit in enumerate(number):
+        value: int = DIGITS.index(digit)
+        mask |= 1 << value
+        packed |= value << (FIELD_BITS * position)
+
+    return mask, packed
+
+
+@lru_cache(maxsize=None)
+def _field_masks(num_digits: int) -> tuple[int, int]:
+    """
+    Returns masks of the low FIELD_BITS - 1 bits and the high bit of every field.
+    """
+    ones: int = sum(1 << (FIELD_BITS * position) for position in range(num_digits))
+    high: int = ones << (FIELD_BITS - 1)
+
+    return high - ones, high
+
+
+def score(guess: tuple[int, int], secret_num: tuple[int, int]) -> tuple[int, int]:
+    """
+    Counts the Fermis and Picos of an encoded guess against an encoded secret
+    number. Both must have the same length.
+
+    :param guess: The guess, from `encode`.
+    :type guess: tuple[int, int]
+    :param secret_num: The secret number, from `encode`.
+    :type secret_num: tuple[int, int]
+    :return: The number of Fermis and Picos.
+    :rtype: tuple[int, int]
+    """
+    common: int = (guess[0] & secret_num[0]).bit_count()
+    num_digits: int = guess[0].bit_count()
+    low, high = _field_masks(num_digits)
+
+    # A field is not empty if any of its bits are set in the XOR.
+    different: int = guess[1] ^ secret_num[1]
+    filled: int = (((different & low) + low) | different) & high
+    fermi: int = num_digits - filled.bit_count()
+
+    return fermi, common - fermi
+
+
+def score_many(guess: tuple[int, int], candidates: list[tuple[int, int]]) -> list[int]:
+    """
+    Scores an encoded guess against many encoded numbers of the same length, as
+    clue codes of fermi * (length + 1) + pico.
+
+    :param guess: The guess, from `encode`.
+    :type guess: tuple[int, int]
+    :param candidates: The numbers, from `encode`.
+    :type candidates: list[tuple[int, int]]
+    :return: The clue code of each number.
+    :rtype: list[int]
+    """
+    guess_mask, guess_packed = guess
+    num_digits: int = guess_mask.bit_count()
+    low, high = _field_masks(num_digits)
+
+    codes: list[int] = []
+    for mask, packed in candidates:
+        different: int = packed ^ guess_packed
+        filled: int = (((different & low) + low) | different) & high
+        fermi: int = num_digits - filled.bit_count()
+        codes.append(fermi * num_digits + (mask & guess_mask).bit_count())
+
+    return codes
+
+
 def play_new_game() -> bool:
     response: str = input("Would you like to play again? (y/n)\n> ")
 
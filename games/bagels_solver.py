@@ -0,0 +1,285 @@
+"""bagels_solver.py -- John Michael Jarvis JMJarvis1@icloud.com
+
+A solver for bagels.py. Every secret number of NUM_DIGITS unique digits is a
+candidate (720 of them for 3 digits), and the clue of every guess against
+every candidate is precomputed into a feedback matrix of uint8 clue codes,
+one row per guess:
+
+    code = fermi * (NUM_DIGITS + 1) + pico
+
+Each clue received rules out the candidates whose code differs, which is a
+single comparison over a row of the matrix. The next guess is the one that
+splits the remaining candidates best, either by the size of the largest group
+left after its clue (minimax) or by the information its clue is expected to
+give (entropy). Playing the solver against every secret gives the average and
+worst-case number of guesses of each strategy.
+"""
+
+import argparse
+
+import numpy as np
+
+from bagels import MAX_GUESSES, NUM_DIGITS
+
+NUM_CLUES: int = (NUM_DIGITS + 1) ** 2  # Number of possible clue codes
+SOLVED: int = NUM_DIGITS * (NUM_DIGITS + 1)  # Code of an all "Fermi" clue
+STRATEGIES: tuple[str, ...] = ("minimax", "entropy")
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    if args.clues:
+        history: list[tuple[str, str]] = [
+            tuple(clue.split("=", 1)) for clue in args.clues
+        ]
+        guess, remaining = hint(history, args.strategy)
+        print(f"{remaining} possible secret number(s) left. Try {guess}.")
+        return
+
+    for strategy in STRATEGIES if args.strategy is None else (args.strategy,):
+        guess_counts: np.ndarray = evaluate(strategy)
+        histogram: np.ndarray = np.bincount(guess_counts)
+        print(f"Strategy:        {strategy}")
+        print(f"Average guesses: {guess_counts.mean():.4f}")
+        print(f"Worst case:      {guess_counts.max()} guesses")
+        print(
+            "Guesses needed:  "
+            + ", ".join(
+                f"{guesses}: {count}"
+                for guesses, count in enumerate(histogram)
+                if count
+            )
+        )
+        print(
+            f"Solved within {MAX_GUESSES}: {np.mean(guess_counts <= MAX_GUESSES):.2%}"
+        )
+        print()
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Bagels solver.")
+    parser.add_argument(
+        "--strategy",
+        choices=STRATEGIES,
+        default=None,
+        help="Guess selection strategy (default: evaluate both).",
+    )
+    parser.add_argument(
+        "clues",
+        nargs="*",
+        help="Clues so far, as GUESS=CLUE (i.e. 123='Pico Fermi'), to get a hint.",
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    for clue in args.clues:
+        if "=" not in clue:
+            parser.error(f"clue {clue!r} must be given as GUESS=CLUE")
+
+    return args
+
+
+def build_candidates() -> np.ndarray:
+    """
+    Lists every possible secret number, in increasing order.
+
+    :return: The digits of each candidate, one row per candidate.
+    :rtype: np.ndarray
+    """
+    candidates: list[tuple[int, ...]] = [()]
+    for position in range(NUM_DIGITS):
+        candidates = [
+            digits + (digit,)
+            for digits in candidates
+            for digit in range(10)
+            if digit not in digits
+        ]
+
+    return np.array(candidates, dtype=np.uint8)
+
+
+def build_feedback(candidates: np.ndarray) -> np.ndarray:
+    """
+    Computes the clue code of every candidate guessed against every candidate.
+
+    :param candidates: The digits of each candidate.
+    :type candidates: np.ndarray
+    :return: Clue codes, indexed by [guess, secret].
+    :rtype: np.ndarray
+    """
+    fermi: np.ndarray = (candidates[:, None, :] == candidates[None, :, :]).sum(axis=2)
+
+    presence: np.ndarray = np.zeros((len(candidates), 10), dtype=np.int16)
+    np.put_along_axis(presence, candidates.astype(np.intp), 1, axis=1)
+    common: np.ndarray = presence @ presence.T  # Digits shared, in any place
+
+    return (fermi * (NUM_DIGITS + 1) + common - fermi).astype(np.uint8)
+
+
+CANDIDATES: np.ndarray = build_candidates()
+FEEDBACK: np.ndarray = build_feedback(CANDIDATES)
+INDEX: dict[str, int] = {
+    "".join(map(str, digits)): index for index, digits in enumerate(CANDIDATES)
+}
+
+
+def encode_clue(clue: str) -> int:
+    """
+    Turns a clue from `bagels.get_clue` into its clue code.
+
+    :param clue: The clue, i.e. "Pico Fermi" or "Bagels".
+    :type clue: str
+    :return: The clue code.
+    :rtype: int
+    """
+    words: list[str] = clue.split()
+    return words.count("Fermi") * (NUM_DIGITS + 1) + words.count("Pico")
+
+
+def choose_guess(remaining: np.ndarray, strategy: str = "minimax") -> int:
+    """
+    Picks the guess that best splits the remaining candidates. Ties go to a
+    guess that could itself be the secret, then to the lowest number.
+
+    :param remaining: Indices of the candidates still possible.
+    :type remaining: np.ndarray
+    :param strategy: "minimax" or "entropy", defaults to "minimax"
+    :type strategy: str, optional
+    :raises ValueError: Raised if the strategy is unknown or no candidates remain.
+    :return: Index of the guess.
+    :rtype: int
+    """
+    if strategy not in STRATEGIES or len(remaining) == 0:
+        raise ValueError("An error occurred", "ValueError", f"strategy = {strategy}")
+    if len(remaining) <= 2:
+        return int(remaining[0])
+
+    # Size of each group of candidates left after each guess's clue.
+    codes: np.ndarray = FEEDBACK[:, remaining].astype(np.intp)
+    codes += np.arange(len(CANDIDATES))[:, None] * NUM_CLUES
+    groups: np.ndarray = np.bincount(
+        codes.ravel(), minlength=len(CANDIDATES) * NUM_CLUES
+    ).reshape(len(CANDIDATES), NUM_CLUES)
+
+    if strategy == "minimax":
+        scores: np.ndarray = groups.max(axis=1).astype(np.float64)
+    else:
+        shares: np.ndarray = groups / len(remaining)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.nansum(shares * np.log2(shares), axis=1)  # -entropy
+
+    # Prefer guesses that could win outright among the best scores.
+    is_candidate: np.ndarray = np.zeros(len(CANDIDATES), dtype=bool)
+    is_candidate[remaining] = True
+    best: np.ndarray = np.isclose(scores, scores.min())
+    preferred: np.ndarray = np.flatnonzero(best & is_candidate)
+
+    return int(preferred[0] if len(preferred) else np.flatnonzero(best)[0])
+
+
+class Solver:
+    """
+    Plays a game of bagels, keeping track of the secret numbers still possible.
+    """
+
+    def __init__(self, strategy: str = "minimax") -> None:
+        """
+        :param strategy: "minimax" or "entropy", defaults to "minimax"
+        :type strategy: str, optional
+        """
+        self.strategy: str = strategy
+        self.reset()
+
+    def reset(self) -> None:
+        """Starts a new game with every secret number possible."""
+        self.remaining: np.ndarray = np.arange(len(CANDIDATES))
+
+    def next_guess(self) -> str:
+        """
+        :return: The best guess to make next.
+        :rtype: str
+        """
+        index: int = choose_guess(self.remaining, self.strategy)
+        return "".join(map(str, CANDIDATES[index]))
+
+    def update(self, guess: str, clue: str) -> None:
+        """
+        Rules out the candidates that would not have given a clue.
+
+        :param guess: The number guessed.
+        :type guess: str
+        :param clue: The clue received from `bagels.get_clue`.
+        :type clue: str
+        :raises ValueError: Raised if the guess is not a valid number.
+        """
+        if guess not in INDEX:
+            raise ValueError("An error occurred", "ValueError", f"guess = {guess}")
+
+        row: np.ndarray = FEEDBACK[INDEX[guess], self.remaining]
+        self.remaining = self.remaining[row == encode_clue(clue)]
+
+    def possible(self) -> list[str]:
+        """
+        :return: The secret numbers still possible.
+        :rtype: list[str]
+        """
+        return ["".join(map(str, CANDIDATES[index])) for index in self.remaining]
+
+
+def hint(history: list[tuple[str, str]], strategy: str = "minimax") -> tuple[str, int]:
+    """
+    Suggests the next guess of a game in progress.
+
+    :param history: The guesses made so far and the clue given for each.
+    :type history: list[tuple[str, str]]
+    :param strategy: "minimax" or "entropy", defaults to "minimax"
+    :type strategy: str, optional
+    :raises ValueError: Raised if no secret number fits the clues.
+    :return: The suggested guess and the number of secret numbers still possible.
+    :rtype: tuple[str, int]
+    """
+    solver = Solver(strategy or "minimax")
+    for guess, clue in history:
+        solver.update(guess, clue)
+    if len(solver.remaining) == 0:
+        raise ValueError("An error occurred", "ValueError", f"history = {history}")
+
+    return solver.next_guess(), len(solver.remaining)
+
+
+def evaluate(strategy: str = "minimax") -> np.ndarray:
+    """
+    Plays the solver against every secret number. Secrets that have given the
+    same clues so far get the same next guess, so the games are played
+    together as a decision tree.
+
+    :param strategy: "minimax" or "entropy", defaults to "minimax"
+    :type strategy: str, optional
+    :return: Guesses needed for each secret number, including the winning one.
+    :rtype: np.ndarray
+    """
+    guess_counts: np.ndarray = np.zeros(len(CANDIDATES), dtype=np.int64)
+    stack: list[tuple[np.ndarray, int]] = [(np.arange(len(CANDIDATES)), 1)]
+
+    while stack:
+        remaining, guesses = stack.pop()
+        guess: int = choose_guess(remaining, strategy)
+        codes: np.ndarray = FEEDBACK[guess, remaining]
+        for code in np.unique(codes):
+            group: np.ndarray = remaining[codes == code]
+            if code == SOLVED:
+                guess_counts[group] = guesses
+            else:
+                stack.append((group, guesses + 1))
+
+    return guess_counts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,513 @@
+"""bagels_space.py -- John Michael Jarvis JMJarvis1@icloud.com
+
+A solver for bagels.py games too large for the feedback matrix of
+bagels_solver.py, such as 6 digits in base 16 (5,765,760 possible secrets).
+
+The possible secrets are never listed. A `CandidateSpace` numbers them in
+increasing order and keeps one bit per secret, marking those still possible,
+so a space of N secrets takes N / 8 bytes. The digits of a secret are worked
+out from its number only when needed, a chunk of CHUNK_SIZE secrets at a time,
+and clues are scored and candidates ruled out chunk by chunk. Chunks can be
+spread over worker processes.
+
+Scoring every possible guess is out of reach at these sizes, so each move
+scores a random sample of up to PROBE_GUESSES of the remaining candidates and
+plays the one that splits the rest best (by minimax or entropy, as in
+bagels_solver.py).
+"""
+
+import argparse
+import math
+import random
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bagels import BASE, DIGITS, MAX_GUESSES, NUM_DIGITS, get_clue, get_secret_num
+
+CHUNK_SIZE: int = 1 << 16  # Candidates scored at a time (a multiple of 8)
+PROBE_GUESSES: int = 100  # Guesses scored before each move
+MAX_SPACE: int = 1 << 32  # Largest number of candidates (a 512 MB bitset)
+COUNT_BYTES: int = 1 << 20  # Bytes of the bitset counted at a time
+STRATEGIES: tuple[str, ...] = ("minimax", "entropy")
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+    random.seed(args.seed)
+
+    with SpaceSolver(
+        args.digits, args.base, args.strategy, args.probes, args.workers, args.seed
+    ) as solver:
+        print(f"{solver.space.size:,} possible secret numbers.")
+        guess_counts: list[int] = []
+        for game in range(args.games):
+            secret_num: list[str] = get_secret_num(args.digits, args.base)
+            start: float = time.perf_counter()
+            guesses: int = solver.play("".join(secret_num))
+            elapsed: float = time.perf_counter() - start
+            guess_counts.append(guesses)
+            print(
+                f"Game {game + 1}: {''.join(secret_num)} in {guesses} guesses "
+                f"({elapsed:.2f}s)"
+            )
+
+    print(f"\nAverage guesses: {sum(guess_counts) / len(guess_counts):.2f}")
+    print(f"Worst case:      {max(guess_counts)} guesses")
+    wins: int = sum(guesses <= MAX_GUESSES for guesses in guess_counts)
+    print(f"Solved within {MAX_GUESSES}: {wins / len(guess_counts):.2%}")
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Bagels solver for large games.")
+    parser.add_argument(
+        "--digits", type=int, default=NUM_DIGITS, help="Length of the secret number."
+    )
+    parser.add_argument(
+        "--base", type=int, default=BASE, help="Number of different digits (2-36)."
+    )
+    parser.add_argument(
+        "--strategy", choices=STRATEGIES, default="minimax", help="Guess selection."
+    )
+    parser.add_argument(
+        "--probes",
+        type=int,
+        default=PROBE_GUESSES,
+        help="Guesses scored before each move.",
+    )
+    parser.add_argument("--games", type=int, default=1, help="Games to play.")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed for reproducible runs."
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.base not in range(2, len(DIGITS) + 1):
+        parser.error(f"--base must be between 2 and {len(DIGITS)}")
+    if args.digits not in range(1, args.base + 1):
+        parser.error("--digits must be between 1 and --base")
+    if math.perm(args.base, args.digits) > MAX_SPACE:
+        parser.error(f"more than {MAX_SPACE:,} possible secret numbers")
+    for option in ("probes", "games", "workers"):
+        if getattr(args, option) < 1:
+            parser.error(f"--{option} must be at least 1")
+
+    return args
+
+
+class CandidateSpace:
+    """
+    The secret numbers of num_digits unique digits in a base, with one bit per
+    number marking whether it is still possible.
+    """
+
+    def __init__(self, num_digits: int = NUM_DIGITS, base: int = BASE) -> None:
+        """
+        :param num_digits: Length of the secret number, defaults to NUM_DIGITS
+        :type num_digits: int, optional
+        :param base: Number of different digits, defaults to BASE
+        :type base: int, optional
+        :raises ValueError: Raised if the space is empty or larger than MAX_SPACE.
+        """
+        size: int = math.perm(base, num_digits)
+        if base > len(DIGITS) or not 0 < size <= MAX_SPACE:
+            raise ValueError(
+                "An error occurred",
+                "ValueError",
+                f"num_digits = {num_digits}, base = {base}",
+            )
+
+        self.num_digits: int = num_digits
+        self.base: int = base
+        self.size: int = size
+        self.bits: np.ndarray = np.empty((size + 7) // 8, dtype=np.uint8)
+        self.reset()
+
+    def __len__(self) -> int:
+        """Number of secret numbers still possible."""
+        return sum(
+            int(np.bitwise_count(self.bits[start : start + COUNT_BYTES]).sum())
+            for start in range(0, len(self.bits), COUNT_BYTES)
+        )
+
+    def reset(self) -> None:
+        """Marks every secret number as possible."""
+        self.bits.fill(0xFF)
+        if self.size % 8:  # Clear the bits past the last number
+            self.bits[-1] = (1 << self.size % 8) - 1
+
+    def digits(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Works out the digits of numbered secrets.
+
+        :param indices: Numbers of the secrets.
+        :type indices: np.ndarray
+        :return: The digit values, one row per secret.
+        :rtype: np.ndarray
+        """
+        return unrank(indices, self.num_digits, self.base).T
+
+    def index(self, number: str) -> int:
+        """
+        Returns the number of a secret.
+
+        :param number: The secret, i.e. '3a7'.
+        :type number: str
+        :return: Its number, counting from 0 in increasing order.
+        :rtype: int
+        """
+        values: list[int] = [DIGITS.index(digit) for digit in number]
+        radix: list[int] = _radix(self.num_digits, self.base).tolist()
+
+        # Rank of each digit among the digits not used before it.
+        return sum(
+            (value - sum(used < value for used in values[:position])) * radix[position]
+            for position, value in enumerate(values)
+        )
+
+    def number(self, index: int) -> str:
+        """
+        Returns a numbered secret as a string.
+
+        :param index: The number of the secret.
+        :type index: int
+        :return: The secret, i.e. '3a7'.
+        :rtype: str
+        """
+        return "".join(DIGITS[digit] for digit in self.digits(np.array([index]))[0])
+
+    def chunks(self) -> Iterator[tuple[int, int]]:
+        """
+        Splits the space into ranges of CHUNK_SIZE numbers.
+
+        :return: The (start, stop) of each range.
+        :rtype: Iterator[tuple[int, int]]
+        """
+        for start in range(0, self.size, CHUNK_SIZE):
+            yield start, min(start + CHUNK_SIZE, self.size)
+
+    def sample(self, count: int, rng: random.Random) -> np.ndarray:
+        """
+        Picks up to `count` of the remaining candidates at random, walking the
+        space a chunk at a time to find them.
+
+        :param count: Number of candidates to pick.
+        :type count: int
+        :param rng: The random number generator.
+        :type rng: random.Random
+        :return: Numbers of the candidates picked.
+        :rtype: np.ndarray
+        """
+        remaining: int = len(self)
+        ranks: list[int] = (
+            list(range(remaining))
+            if remaining <= count
+            else sorted(rng.sample(range(remaining), count))
+        )
+
+        # Pick by rank among the remaining, then find each rank's number.
+        picked: list[int] = []
+        before: int = 0  # Candidates remaining in the chunks before this one
+        for start, stop in self.chunks():
+            if len(picked) == len(ranks):
+                break
+            bits: np.ndarray = self.bits[start // 8 : (stop + 7) // 8]
+            in_chunk: int = int(np.bitwise_count(bits).sum())
+            if ranks[len(picked)] < before + in_chunk:
+                alive: np.ndarray = np.flatnonzero(
+                    np.unpackbits(bits, count=stop - start, bitorder="little")
+                )
+                while (
+                    len(picked) < len(ranks) and ranks[len(picked)] < before + in_chunk
+                ):
+                    picked.append(start + int(alive[ranks[len(picked)] - before]))
+            before += in_chunk
+
+        return np.array(picked, dtype=np.int64)
+
+
+def unrank(indices: np.ndarray, num_digits: int, base: int) -> np.ndarray:
+    """
+    Works out the digits of numbered secrets, the inverse of
+    `CandidateSpace.index`.
+
+    :param indices: Numbers of the secrets.
+    :type indices: np.ndarray
+    :param num_digits: Length of the numbers.
+    :type num_digits: int
+    :param base: Number of different digits.
+    :type base: int
+    :return: The digit values, one row per position and one column per secret.
+    :rtype: np.ndarray
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    radix: np.ndarray = _radix(num_digits, base)
+    columns: np.ndarray = np.empty((num_digits, len(indices)), dtype=np.uint8)
+
+    for position in range(num_digits):
+        # Rank of this digit among the digits not yet used. Skipping over each
+        # used digit at or below it, `position` passes find the digit itself.
+        rank: np.ndarray = ((indices // radix[position]) % (base - position)).astype(
+            np.uint8
+        )
+        digit: np.ndarray = rank
+        for step in range(position):
+            skipped: np.ndarray = rank.copy()
+            for used in columns[:position]:
+                skipped += used <= digit
+            digit = skipped
+        columns[position] = digit
+
+    return columns
+
+
+def _radix(num_digits: int, base: int) -> np.ndarray:
+    """
+    Numbers sharing their first p digits form blocks of radix[p] numbers.
+    """
+    return np.array(
+        [math.perm(base - p - 1, num_digits - p - 1) for p in range(num_digits)],
+        dtype=np.int64,
+    )
+
+
+def digit_masks(columns: np.ndarray) -> np.ndarray:
+    """
+    Sets bit d of a mask for each digit d in a number.
+
+    :param columns: Digit values, one row per position.
+    :type columns: np.ndarray
+    :return: The mask of each number.
+    :rtype: np.ndarray
+    """
+    masks: np.ndarray = np.zeros(columns.shape[1], dtype=np.uint64)
+    for column in columns:
+        masks |= np.left_shift(np.uint64(1), column, dtype=np.uint64)
+
+    return masks
+
+
+def clue_codes(columns: np.ndarray, masks: np.ndarray, guess: np.ndarray) -> np.ndarray:
+    """
+    Scores a guess against many secrets as codes of fermi * (num_digits + 1) + pico.
+    Fermi compares one digit position of every secret at a time, and the digits
+    in common are the set bits shared by the digit masks.
+
+    :param columns: Digit values of the secrets, one row per position.
+    :type columns: np.ndarray
+    :param masks: Digit masks of the secrets, from `digit_masks`.
+    :type masks: np.ndarray
+    :param guess: Digit values of the guess.
+    :type guess: np.ndarray
+    :return: The clue code of each secret.
+    :rtype: np.ndarray
+    """
+    fermi: np.ndarray = (columns[0] == guess[0]).astype(np.int16)
+    for position in range(1, len(guess)):
+        fermi += columns[position] == guess[position]
+    guess_mask = np.uint64(sum(1 << int(digit) for digit in guess))
+    common: np.ndarray = np.bitwise_count(masks & guess_mask)
+
+    return fermi * len(guess) + common
+
+
+def _count_chunk(task: tuple) -> np.ndarray:
+    """
+    Counts the candidates in a chunk giving each clue to each guess. Executed in
+    the worker processes.
+
+    :param task: Digits, base, chunk start and stop, the chunk's bits and the
+        digit values of the guesses.
+    :type task: tuple
+    :return: Candidates giving each clue code, one row per guess.
+    :rtype: np.ndarray
+    """
+    num_digits, base, start, stop, bits, guesses = task
+    alive: np.ndarray = np.unpackbits(bits, count=stop - start, bitorder="little")
+    columns: np.ndarray = unrank(start + np.flatnonzero(alive), num_digits, base)
+    masks: np.ndarray = digit_masks(columns)
+
+    counts: np.ndarray = np.zeros((len(guesses), (num_digits + 1) ** 2), np.int64)
+    for row, guess in enumerate(guesses):
+        counts[row] = np.bincount(
+            clue_codes(columns, masks, guess), minlength=counts.shape[1]
+        )
+
+    return counts
+
+
+def _prune_chunk(task: tuple) -> np.ndarray:
+    """
+    Clears the bits of the candidates in a chunk that would not have given a
+    clue. Executed in the worker processes.
+
+    :param task: Digits, base, chunk start and stop, the chunk's bits, the digit
+        values of the guess and the clue code received.
+    :type task: tuple
+    :return: The chunk's updated bits.
+    :rtype: np.ndarray
+    """
+    num_digits, base, start, stop, bits, guess, code = task
+    alive: np.ndarray = np.unpackbits(bits, count=stop - start, bitorder="little")
+    offsets: np.ndarray = np.flatnonzero(alive)
+    columns: np.ndarray = unrank(start + offsets, num_digits, base)
+    codes: np.ndarray = clue_codes(columns, digit_masks(columns), guess)
+    alive[offsets[codes != code]] = 0
+
+    return np.packbits(alive, bitorder="little")
+
+
+class _NoPool:
+    """Stands in for a process pool when running in a single process."""
+
+    def map(self, func, tasks):
+        return map(func, tasks)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class SpaceSolver:
+    """
+    Plays games of bagels over a `CandidateSpace`, scoring chunks of the space
+    in worker processes. Use as a context manager to shut the workers down.
+    """
+
+    def __init__(
+        self,
+        num_digits: int = NUM_DIGITS,
+        base: int = BASE,
+        strategy: str = "minimax",
+        probes: int = PROBE_GUESSES,
+        workers: int = 1,
+        seed: int | None = None,
+    ) -> None:
+        """
+        :param num_digits: Length of the secret number, defaults to NUM_DIGITS
+        :type num_digits: int, optional
+        :param base: Number of different digits, defaults to BASE
+        :type base: int, optional
+        :param strategy: "minimax" or "entropy", defaults to "minimax"
+        :type strategy: str, optional
+        :param probes: Guesses scored before each move, defaults to PROBE_GUESSES
+        :type probes: int, optional
+        :param workers: Number of worker processes, defaults to 1
+        :type workers: int, optional
+        :param seed: Seed for the choice of guesses scored, defaults to None
+        :type seed: int | None, optional
+        :raises ValueError: Raised if the strategy is unknown.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                "An error occurred", "ValueError", f"strategy = {strategy}"
+            )
+
+        self.space: CandidateSpace = CandidateSpace(num_digits, base)
+        self.strategy: str = strategy
+        self.probes: int = probes
+        self.rng = random.Random(seed)
+        self.pool = ProcessPoolExecutor(workers) if workers > 1 else _NoPool()
+
+    def __enter__(self) -> "SpaceSolver":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.pool.shutdown()
+
+    def next_guess(self) -> str:
+        """
+        :return: The best of a sample of guesses to make next.
+        :rtype: str
+        """
+        space: CandidateSpace = self.space
+        if len(space) == space.size:  # Every first guess splits the space alike
+            return space.number(0)
+
+        guesses: np.ndarray = space.sample(self.probes, self.rng)
+        if len(guesses) <= 2:
+            return space.number(int(guesses[0]))
+
+        guess_digits: np.ndarray = space.digits(guesses)
+        counts: np.ndarray = sum(self.pool.map(_count_chunk, self._tasks(guess_digits)))
+
+        if self.strategy == "minimax":
+            scores: np.ndarray = counts.max(axis=1).astype(np.float64)
+        else:
+            shares: np.ndarray = counts / counts.sum(axis=1, keepdims=True)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = np.nansum(shares * np.log2(shares), axis=1)  # -entropy
+
+        return space.number(int(guesses[np.argmin(scores)]))
+
+    def update(self, guess: str, clue: str) -> None:
+        """
+        Rules out the candidates that would not have given a clue.
+
+        :param guess: The number guessed.
+        :type guess: str
+        :param clue: The clue received from `bagels.get_clue`.
+        :type clue: str
+        """
+        words: list[str] = clue.split()
+        code: int = words.count("Fermi") * (len(guess) + 1) + words.count("Pico")
+        guess_digits: np.ndarray = np.array(
+            [DIGITS.index(digit) for digit in guess], dtype=np.uint8
+        )
+
+        tasks: list[tuple] = [task + (code,) for task in self._tasks(guess_digits)]
+        bits: list[np.ndarray] = list(self.pool.map(_prune_chunk, tasks))
+        self.space.bits = np.concatenate(bits)
+
+    def play(self, secret_num: str) -> int:
+        """
+        Plays a game against a secret number.
+
+        :param secret_num: The secret number.
+        :type secret_num: str
+        :return: Guesses needed, including the winning one.
+        :rtype: int
+        """
+        self.space.reset()
+        guesses: int = 0
+        while True:
+            guess: str = self.next_guess()
+            guesses += 1
+            if guess == secret_num:
+                return guesses
+            self.update(guess, get_clue(guess, secret_num))
+
+    def _tasks(self, guess_digits: np.ndarray) -> list[tuple]:
+        """
+        Builds one worker task per chunk of the space.
+
+        :param guess_digits: Digit values of the guess (or guesses to score).
+        :type guess_digits: np.ndarray
+        :return: The tasks.
+        :rtype: list[tuple]
+        """
+        space: CandidateSpace = self.space
+        return [
+            (
+                space.num_digits,
+                space.base,
+                start,
+                stop,
+                space.bits[start // 8 : (stop + 7) // 8],
+                guess_digits,
+            )
+            for start, stop in space.chunks()
+        ]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+"""bagels_tournament.py -- John Michael Jarvis JMJarvis1@icloud.com
+
+Benchmarks guessing strategies for bagels.py without the keyboard. Each
+strategy plays against every secret number (or a seeded random sample of
+them), with games split across worker processes, and the tournament reports
+for each strategy:
+
+    - a histogram of the guesses needed to win,
+    - the share of games won within MAX_GUESSES, and
+    - the time taken by each move (choosing a guess and reading its clue).
+
+A strategy is an object with three methods - `reset()` to start a new game,
+`next_guess()` returning a guess, and `update(guess, clue)` receiving the clue
+from `bagels.get_clue` - made by a factory taking the number of digits, the
+base and a random number generator. Strategies are named in STRATEGIES, and
+others can be given as 'module:factory'.
+
+Results are written as a table, or as CSV or JSON with fixed columns so that
+runs can be compared over time.
+"""
+
+import argparse
+import csv
+import importlib
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from bagels import BASE, DIGITS, MAX_GUESSES, NUM_DIGITS, get_clue
+from bagels_solver import Solver
+from bagels_space import clue_codes, digit_masks, unrank
+
+GUESS_LIMIT: int = 50  # Guesses after which a game is given up
+GAMES_PER_TASK: int = 100  # Games played by each worker task
+CSV_COLUMNS: tuple[str, ...] = (
+    "strategy",
+    "digits",
+    "base",
+    "games",
+    "wins",
+    "win_rate",
+    "mean_guesses",
+    "worst_guesses",
+    "moves",
+    "latency_mean_us",
+    "latency_p50_us",
+    "latency_p95_us",
+    "latency_max_us",
+    "histogram",
+)
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    secrets: list[str] = list_secrets(args.digits, args.base, args.sample, args.seed)
+    results: list[dict] = [
+        run_tournament(
+            strategy, secrets, args.digits, args.base, args.seed, args.workers
+        )
+        for strategy in args.strategies
+    ]
+
+    output = sys.stdout if args.output is None else open(args.output, "w", newline="")
+    try:
+        write_results(results, args.format, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Bagels strategy tournament.")
+    parser.add_argument(
+        "strategies",
+        nargs="*",
+        help=f"Strategies to play: {', '.join(sorted(STRATEGIES))} or module:factory "
+        "(default: every strategy that plays the size of game).",
+    )
+    parser.add_argument(
+        "--digits", type=int, default=NUM_DIGITS, help="Length of the secret number."
+    )
+    parser.add_argument(
+        "--base", type=int, default=BASE, help="Number of different digits (2-36)."
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=None,
+        help="Play a random sample of secrets instead of every one.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for the sample and strategies."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of worker processes."
+    )
+    parser.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    parser.add_argument("--output", default=None, help="File to write results to.")
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.base not in range(2, len(DIGITS) + 1):
+        parser.error(f"--base must be between 2 and {len(DIGITS)}")
+    if args.digits not in range(1, args.base + 1):
+        parser.error("--digits must be between 1 and --base")
+    if args.sample is not None and args.sample < 1:
+        parser.error("--sample must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    solver_size: bool = (args.digits, args.base) == (NUM_DIGITS, BASE)
+    if not args.strategies:
+        args.strategies = [
+            name for name in sorted(STRATEGIES) if solver_size or name not in SOLVERS
+        ]
+    for strategy in args.strategies:
+        try:
+            load_strategy(strategy)
+        except (ImportError, AttributeError, ValueError):
+            parser.error(f"unknown strategy {strategy!r}")
+        if strategy in SOLVERS and not solver_size:
+            parser.error(f"{strategy} only plays {NUM_DIGITS} digits in base {BASE}")
+
+    return args
+
+
+class ConsistentStrategy:
+    """
+    Guesses a number that fits every clue so far: the first in increasing
+    order, or one picked at random.
+    """
+
+    def __init__(
+        self, num_digits: int, base: int, rng: random.Random, pick_random: bool
+    ) -> None:
+        """
+        :param num_digits: Length of the secret number.
+        :type num_digits: int
+        :param base: Number of different digits.
+        :type base: int
+        :param rng: The random number generator.
+        :type rng: random.Random
+        :param pick_random: Pick a fitting number at random rather than the first.
+        :type pick_random: bool
+        """
+        numbers, columns, masks = list_candidates(num_digits, base)
+        self.numbers: tuple[str, ...] = numbers
+        self.columns: np.ndarray = columns
+        self.masks: np.ndarray = masks
+        self.rng: random.Random = rng
+        self.pick_random: bool = pick_random
+        self.reset()
+
+    def reset(self) -> None:
+        """Starts a new game with every number possible."""
+        self.remaining: np.ndarray = np.arange(len(self.numbers))
+
+    def next_guess(self) -> str:
+        """Returns a number that fits every clue so far."""
+        if self.pick_random:
+            return self.numbers[self.rng.choice(self.remaining)]
+        return self.numbers[self.remaining[0]]
+
+    def update(self, guess: str, clue: str) -> None:
+        """Rules out the numbers that would not have given a clue."""
+        words: list[str] = clue.split()
+        code: int = words.count("Fermi") * (len(guess) + 1) + words.count("Pico")
+        codes: np.ndarray = clue_codes(
+            self.columns[:, self.remaining],
+            self.masks[self.remaining],
+            np.array([DIGITS.index(digit) for digit in guess], dtype=np.uint8),
+        )
+        self.remaining = self.remaining[codes == code]
+
+
+@lru_cache(maxsize=None)
+def list_candidates(
+    num_digits: int, base: int
+) -> tuple[tuple[str, ...], np.ndarray, np.ndarray]:
+    """
+    Lists every possible secret number in increasing order, with its digit
+    values and digit mask for `bagels_space.clue_codes`. Each process lists
+    them once for each size of game, and every strategy of that size shares
+    them.
+
+    :param num_digits: Length of the secret number.
+    :type num_digits: int
+    :param base: Number of different digits.
+    :type base: int
+    :return: The numbers, their digit values (one row per position) and their
+        digit masks.
+    :rtype: tuple[tuple[str, ...], np.ndarray, np.ndarray]
+    """
+    columns: np.ndarray = unrank(
+        np.arange(math.perm(base, num_digits)), num_digits, base
+    )
+    numbers: tuple[str, ...] = tuple(
+        "".join(digits) for digits in itertools.permutations(DIGITS[:base], num_digits)
+    )
+
+    return numbers, columns, digit_masks(columns)
+
+
+def solver_strategy(num_digits: int, base: int, strategy: str) -> Solver:
+    """
+    Creates a bagels_solver.Solver, which only plays NUM_DIGITS digits in BASE.
+
+    :raises ValueError: Raised for any other size of game.
+    """
+    if (num_digits, base) != (NUM_DIGITS, BASE):
+        raise ValueError(
+            "An error occurred",
+            "ValueError",
+            f"num_digits = {num_digits}, base = {base}",
+        )
+
+    return Solver(strategy)
+
+
+SOLVERS: tuple[str, ...] = ("minimax", "entropy")  # Strategies of bagels_solver
+STRATEGIES: dict[str, Callable] = {
+    "first": lambda digits, base, rng: ConsistentStrategy(digits, base, rng, False),
+    "random": lambda digits, base, rng: ConsistentStrategy(digits, base, rng, True),
+    "minimax": lambda digits, base, rng: solver_strategy(digits, base, "minimax"),
+    "entropy": lambda digits, base, rng: solver_strategy(digits, base, "entropy"),
+}
+
+
+def load_strategy(name: str) -> Callable:
+    """
+    Finds a strategy factory by name, or imports one given as 'module:factory'.
+
+    :param name: Name in STRATEGIES, or 'module:factory'.
+    :type name: str
+    :raises ValueError: Raised if the name is neither.
+    :return: The strategy factory.
+    :rtype: Callable
+    """
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    if ":" not in name:
+        raise ValueError("An error occurred", "ValueError", f"name = {name}")
+
+    module_name, factory_name = name.split(":", 1)
+    return getattr(importlib.import_module(module_name), factory_name)
+
+
+def list_secrets(
+    num_digits: int, base: int, sample: int | None = None, seed: int | None = None
+) -> list[str]:
+    """
+    Lists the secret numbers to play against.
+
+    :param num_digits: Length of the secret number.
+    :type num_digits: int
+    :param base: Number of different digits.
+    :type base: int
+    :param sample: Number of distinct secrets to sample, defaults to every secret
+    :type sample: int | None, optional
+    :param seed: Seed for the sample, defaults to None
+    :type seed: int | None, optional
+    :return: The secret numbers.
+    :rtype: list[str]
+    """
+    total: int = math.perm(base, num_digits)
+    if sample is None or sample >= total:
+        return [
+            "".join(digits)
+            for digits in itertools.permutations(DIGITS[:base], num_digits)
+        ]
+
+    rng = random.Random(seed)
+    if total > np.iinfo(np.int64).max:
+        # Too many to number in 64 bits, so draw numbers and skip any repeats
+        secrets: dict[str, None] = {}
+        while len(secrets) < sample:
+            secrets["".join(rng.sample(DIGITS[:base], num_digits))] = None
+        return list(secrets)
+
+    # Distinct numbers of secrets, so that no secret is played twice
+    columns: np.ndarray = unrank(rng.sample(range(total), sample), num_digits, base)
+    return ["".join(DIGITS[digit] for digit in digits) for digits in columns.T]
+
+
+def run_tournament(
+    strategy: str,
+    secrets: list[str],
+    num_digits: int = NUM_DIGITS,
+    base: int = BASE,
+    seed: int | None = 0,
+    workers: int = 1,
+) -> dict:
+    """
+    Plays a strategy against each secret number and summarizes the games.
+
+    :param strategy: Name of the strategy (see `load_strategy`).
+    :type strategy: str
+    :param secrets: The secret numbers to play against.
+    :type secrets: list[str]
+    :param num_digits: Length of the secret number, defaults to NUM_DIGITS
+    :type num_digits: int, optional
+    :param base: Number of different digits, defaults to BASE
+    :type base: int, optional
+    :param seed: Seed for strategies that pick at random, defaults to 0
+    :type seed: int | None, optional
+    :param workers: Number of worker processes, defaults to 1
+    :type workers: int, optional
+    :return: The results, keyed by the names in CSV_COLUMNS.
+    :rtype: dict
+    """
+    tasks: list[tuple] = [
+        (
+            strategy,
+            num_digits,
+            base,
+            secrets[start : start + GAMES_PER_TASK],
+            seed,
+            task,
+        )
+        for task, start in enumerate(range(0, len(secrets), GAMES_PER_TASK))
+    ]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            played: list[tuple] = list(pool.map(_play_games, tasks))
+    else:
+        played = list(map(_play_games, tasks))
+
+    guess_counts: list[int] = [count for counts, _ in played for count in counts]
+    latencies: list[int] = sorted(ns for _, times in played for ns in times)
+    wins: int = sum(0 < count <= MAX_GUESSES for count in guess_counts)
+    solved: list[int] = [count for count in guess_counts if count > 0]
+
+    histogram: dict[str, int] = {}
+    for count in sorted(guess_counts, key=lambda count: (count == 0, count)):
+        label: str = str(count) if count else "unsolved"
+        histogram[label] = histogram.get(label, 0) + 1
+
+    return {
+        "strategy": strategy,
+        "digits": num_digits,
+        "base": base,
+        "games": len(guess_counts),
+        "wins": wins,
+        "win_rate": round(wins / len(guess_counts), 6),
+        "mean_guesses": round(sum(solved) / len(solved), 6) if solved else None,
+        "worst_guesses": max(solved) if solved else None,
+        "moves": len(latencies),
+        "latency_mean_us": round(sum(latencies) / len(latencies) / 1000, 3),
+        "latency_p50_us": round(_percentile(latencies, 0.50) / 1000, 3),
+        "latency_p95_us": round(_percentile(latencies, 0.95) / 1000, 3),
+        "latency_max_us": round(latencies[-1] / 1000, 3),
+        "histogram": histogram,
+    }
+
+
+def _play_games(task: tuple) -> tuple[list[int], list[int]]:
+    """
+    Plays one task of a tournament. Executed in the worker processes.
+
+    :param task: Strategy name, digits, base, secret numbers, seed and task number.
+    :type task: tuple
+    :return: Guesses needed for each game (0 if given up) and the time of each
+        move in nanoseconds.
+    :rtype: tuple[list[int], list[int]]
+    """
+    name, num_digits, base, secrets, seed, task_num = task
+    rng = random.Random(None if seed is None else f"{seed}:{task_num}")
+    clue_rng = random.Random(None if seed is None else f"{seed}:{task_num}:clues")
+    strategy = load_strategy(name)(num_digits, base, rng)
+    clock: Callable[[], int] = time.perf_counter_ns
+
+    guess_counts: list[int] = []
+    latencies: list[int] = []
+    for secret_num in secrets:
+        strategy.reset()
+        guess_count: int = 0
+        while guess_count < GUESS_LIMIT:
+            start: int = clock()
+            guess: str = strategy.next_guess()
+            elapsed: int = clock() - start
+            guess_count += 1
+            if guess == secret_num:
+                latencies.append(elapsed)
+                break
+
+            clue: str = get_clue(guess, secret_num, clue_rng)  # Not part of the move
+            start = clock()
+            strategy.update(guess, clue)
+            latencies.append(elapsed + clock() - start)
+        else:
+            guess_count = 0  # Given up
+
+        guess_counts.append(guess_count)
+
+    return guess_counts, latencies
+
+
+def _percentile(values: list[int], share: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return values[min(len(values) - 1, max(0, math.ceil(share * len(values)) - 1))]
+
+
+def write_results(results: list[dict], output_format: str, output) -> None:
+    """
+    Writes tournament results.
+
+    :param results: Results of each strategy, from `run_tournament`.
+    :type results: list[dict]
+    :param output_format: "table", "csv" or "json".
+    :type output_format: str
+    :param output: File to write to.
+    """
+    if output_format == "json":
+        json.dump(results, output, indent=2, sort_keys=True)
+        output.write("\n")
+    elif output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        for result in results:
+            row: dict = dict(result)
+            row["histogram"] = " ".join(
+                f"{guesses}:{count}" for guesses, count in result["histogram"].items()
+            )
+            writer.writerow(row)
+    else:
+        for result in results:
+            print(f"Strategy:          {result['strategy']}", file=output)
+            print(
+                f"Games won:         {result['wins']:,} of {result['games']:,} "
+                f"within {MAX_GUESSES} guesses ({result['win_rate']:.2%})",
+                file=output,
+            )
+            print(f"Average guesses:   {result['mean_guesses']}", file=output)
+            print(f"Worst case:        {result['worst_guesses']}", file=output)
+            print(
+                f"Move latency (us): mean {result['latency_mean_us']}, "
+                f"p50 {result['latency_p50_us']}, p95 {result['latency_p95_us']}, "
+                f"max {result['latency_max_us']}",
+                file=output,
+            )
+            print(
+                "Guesses needed:    "
+                + ", ".join(f"{k}: {v}" for k, v in result["histogram"].items()),
+                file=output,
+            )
+            print(file=output)
+
+
+if __name__ == "__main__":
+    main()
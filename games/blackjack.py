@@ -34,13 +34,15 @@ More information can be found at: https://en.wikipedia.org/wiki/blackjack
 
 import sys
 import os
-import json
-import logging
 import random
 import time
 import game_functions
+from array import array
 from typing import Literal
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resources
 
 # Constants
 HEARTS: str = chr(9829)  # Character 9829 is '♥'
@@ -48,23 +50,55 @@ SPADES: str = chr(9824)  # Character 9824 is '♠'
 CLUBS: str = chr(9827)  # Character 9824 is '♣'
 DIAMONDS: str = chr(9830)  # Character 9830 is '♦'
 MONEY: int = 5000
+NUM_DECKS: int = 1  # Decks in the shoe (1-8)
+PENETRATION: float = 0.75  # Share of the shoe dealt before the cut card
+TEXT_KEY: str = "blackjack.py"  # Key of the game's text in text.json
+
+RANKS: list[str] = [str(num) for num in range(2, 11)] + ["J", "Q", "K", "A"]
+SUITS: list[str] = [HEARTS, SPADES, CLUBS, DIAMONDS]
+RANK_VALUES: dict[str, int] = {
+    rank: 1 if rank == "A" else 10 if rank in ["K", "Q", "J"] else int(rank)
+    for rank in RANKS
+}
+
+# Cards as small ints: rank index * 4 + suit index (0-51).
+CARD_CODES: dict[tuple[str, str], int] = {
+    (rank, suit): rank_num * 4 + suit_num
+    for rank_num, rank in enumerate(RANKS)
+    for suit_num, suit in enumerate(SUITS)
+}
+CARD_VALUES: tuple[int, ...] = tuple(
+    RANK_VALUES[rank] for rank in RANKS for suit in SUITS
+)  # Value of each card code, aces count 1
+ACE_CODES: frozenset[int] = frozenset(CARD_CODES["A", suit] for suit in SUITS)
+
+# Best value and soft flag of a hand by [hard total][holds an ace]. Hard totals
+# stop at 31 (hitting 21 with a 10).
+MAX_HARD_TOTAL: int = 31
+HAND_VALUES: tuple[tuple[int, int], ...] = tuple(
+    (hard, hard + 10 if hard + 10 <= 21 else hard) for hard in range(MAX_HARD_TOTAL + 1)
+)
+SOFT_HANDS: tuple[tuple[bool, bool], ...] = tuple(
+    (False, hard + 10 <= 21) for hard in range(MAX_HARD_TOTAL + 1)
+)
 
 
 def main() -> None:
     current_hand, money = start_new_game()
     display_info()
+    deck: Shoe = Shoe(NUM_DECKS, PENETRATION)
 
     while True:  # Main game loop.
         player_move: str = ""
-        # Create card deck
-        deck: list[tuple[str, str]] = build_deck()
+        # Reshuffle the shoe once the cut card has been dealt
+        deck.start_hand()
 
         # Get player wager
         wager: int = get_wager(money)
 
         # Deal hands
-        player_hand: list = [deck.pop() for i in range(2)]
-        dealer_hand: list = [deck.pop() for i in range(2)]
+        player_hand: Hand = Hand(deck.pop() for i in range(2))
+        dealer_hand: Hand = Hand(deck.pop() for i in range(2))
 
         # Display Hands
         print()
@@ -150,7 +184,9 @@ def start_new_game() -> tuple[int, int]:
 
 def display_info(title=True, rules=True) -> None:
     """
-    Load the Title and Rules texts from a json file and display them on the screen.
+    Display the Title and Rules texts from text.json on the screen. The texts
+    are loaded and formatted once by `resources`, and left out if the file is
+    missing.
 
     :param title: Include title text, defaults to True
     :type intro: bool, optional
@@ -159,43 +195,246 @@ def display_info(title=True, rules=True) -> None:
     """
     game_functions.clear_scrn()
 
-    # Load program text from JSON file.
-    sys.path.append(os.getcwd() + "../")  # Make sure file is in path
-    try:
-        game_txt: dict = load_json_txt(
-            path="/workspaces/python_games/games/text.json", key="blackjack.py"
-        )
-    except FileNotFoundError:
-        logging.error(" A fatal error occurred when attempting to load 'text.json.'")
-        game_functions.exit_game()
-
     # Display Introduction
     if title:
-        title_txt: list = game_txt["title"]
-        game_functions.display_message(title_txt, msg_just="center")
+        title_txt: str = resources.compile_text(TEXT_KEY, "title", msg_just="center")
+        print(title_txt) if title_txt else None
 
     # Display rules
     if rules:
-        rules_intro: list = game_txt["rules"]
-        game_functions.display_message(rules_intro)
+        rules_txt: str = resources.compile_text(TEXT_KEY, "rules")
+        print(rules_txt) if rules_txt else None
     print()
 
 
-def build_deck() -> list[tuple[str, str]]:
+class Card(int):
+    """
+    A playing card stored as its code (rank index * 4 + suit index), which fits
+    in a single byte. There is one shared instance per code in CARDS, and the
+    rank and suit strings are only looked up when the card is displayed.
+    """
+
+    __slots__ = ()
+
+    @property
+    def rank(self) -> str:
+        """Rank of the card, i.e. '10' or 'K'."""
+        return RANKS[self >> 2]
+
+    @property
+    def suit(self) -> str:
+        """Suit of the card, i.e. '♥'."""
+        return SUITS[self & 3]
+
+    @property
+    def value(self) -> int:
+        """Value of the card, counting an ace as 1."""
+        return CARD_VALUES[self]
+
+    def __str__(self) -> str:
+        return f"{self.rank}{self.suit}"
+
+    def __repr__(self) -> str:
+        return f"Card({int(self)})"
+
+
+CARDS: tuple[Card, ...] = tuple(Card(code) for code in range(len(CARD_VALUES)))
+
+# Rows of card art of each card code (rank to 2 digits, suit, bottom edge),
+# and of a face-down card.
+CARD_ART: tuple[tuple[str, ...], ...] = tuple(
+    (" ___  ", f"|{card.rank:<2} | ", f"| {card.suit} | ", f"|_{card.rank:_>2}| ")
+    for card in CARDS
+)
+HIDDEN_ART: tuple[str, ...] = (" ___  ", "|## | ", "|###| ", "|_##| ")
+
+
+class Hand:
     """
-    Create and return a shuffled deck of cards.
+    The cards held by the player or dealer.
 
-    :return: A shuffled deck of cards
-    :rtype: list[tuple[str, str]]
+    Cards are kept as a bytearray of codes. The (hard_total, soft_ace_count)
+    state is updated as each card is added, so the value and soft flag are
+    always ready. The art of each card is rendered once for every hand, in
+    CARD_ART.
     """
-    # deck: list[tuple[str, str]] = []
-    ranks: list = [str(num) for num in range(2, 11)] + ["J", "Q", "K", "A"]
-    suits: list[str] = [HEARTS, SPADES, CLUBS, DIAMONDS]
 
-    deck: list[tuple[str, str]] = [(rank, suit) for rank in ranks for suit in suits]
+    __slots__ = ("codes", "hard", "aces")
+
+    def __init__(self, cards=()) -> None:
+        """
+        :param cards: Cards (or card codes) to start the hand with, defaults to ()
+        """
+        self.codes: bytearray = bytearray()
+        self.hard: int = 0
+        self.aces: int = 0
+        for card in cards:
+            self.append(card)
+
+    def __len__(self) -> int:
+        return len(self.codes)
 
-    random.shuffle(deck)
-    return deck
+    def __iter__(self):
+        return (CARDS[code] for code in self.codes)
+
+    def __getitem__(self, index: int) -> Card:
+        return CARDS[self.codes[index]]
+
+    def append(self, card: int) -> None:
+        """
+        Adds a card to the hand.
+
+        :param card: The card (or card code) taken.
+        :type card: int
+        """
+        self.codes.append(card)
+        self.hard, self.aces = add_card((self.hard, self.aces), card)
+
+    @property
+    def value(self) -> int:
+        """Best value of the hand."""
+        return hand_value((self.hard, self.aces))
+
+    @property
+    def soft(self) -> bool:
+        """True if the hand counts an ace as 11."""
+        return is_soft((self.hard, self.aces))
+
+    def art(self, hide_dealer: bool) -> str:
+        """
+        Returns the card art of the hand, joined from the art of each card.
+
+        :param hide_dealer: Hides the first card in the hand.
+        :type hide_dealer: bool
+        :return: The rows of card art, joined by newlines.
+        :rtype: str
+        """
+        arts: list[tuple[str, ...]] = [CARD_ART[code] for code in self.codes]
+        if hide_dealer and arts:  # Hide first card
+            arts[0] = HIDDEN_ART
+
+        rows: list[str] = ["".join(row) for row in zip(*arts)] or [""] * len(HIDDEN_ART)
+
+        return "\n".join(rows + [""])  # Ends with an empty row, as it always has
+
+
+class Shoe:
+    """
+    A shoe of one or more shuffled decks.
+
+    Cards are held as codes in a preallocated array and dealt by moving a
+    cursor. The shoe is only reshuffled (in place) once the cut card, placed
+    at `penetration` of the way through the shoe, has been dealt, which
+    `start_hand` checks before each hand. If the shoe runs out mid-hand, only
+    the cards dealt before that hand are shuffled back in.
+
+    Counters (such as blackjack_count.CardCounter) added to `counters` are
+    reset whenever the shoe is shuffled, and read the cards dealt since from
+    `cards[:cursor]`, so dealing a card costs nothing extra.
+    """
+
+    def __init__(
+        self,
+        num_decks: int = 1,
+        penetration: float = PENETRATION,
+        rng: random.Random | None = None,
+    ) -> None:
+        """
+        :param num_decks: Number of decks in the shoe (1-8), defaults to 1
+        :type num_decks: int, optional
+        :param penetration: Share of the shoe dealt before reshuffling, defaults to PENETRATION
+        :type penetration: float, optional
+        :param rng: Random number generator for shuffling, defaults to a new one
+        :type rng: random.Random | None, optional
+        :raises ValueError: Raised if num_decks or penetration is out of range.
+        """
+        if num_decks not in range(1, 9):
+            raise ValueError(
+                "An error occurred", "ValueError", f"num_decks = {num_decks}"
+            )
+        if not 0 < penetration <= 1:
+            raise ValueError(
+                "An error occurred", "ValueError", f"penetration = {penetration}"
+            )
+
+        self.num_decks: int = num_decks
+        self.rng: random.Random = random.Random() if rng is None else rng
+        self.cards: array = array("B", range(len(CARDS))) * num_decks
+        self.cut_card: int = int(len(self.cards) * penetration)
+        self.cursor: int = 0
+        self.counters: list = []  # Reset on every shuffle
+        self.hand_start: int = 0  # Position of the first card of the hand in play
+        self.shuffle()
+
+    def __len__(self) -> int:
+        """Number of cards left in the shoe."""
+        return len(self.cards) - self.cursor
+
+    @property
+    def cut_card_reached(self) -> bool:
+        """True once the cut card has been dealt."""
+        return self.cursor >= self.cut_card
+
+    def shuffle(self) -> None:
+        """Return all cards to the shoe and shuffle them."""
+        self.rng.shuffle(self.cards)
+        self.cursor = 0
+        self.hand_start = 0
+        for counter in self.counters:
+            counter.reset()
+
+    def start_hand(self) -> None:
+        """
+        Prepares the shoe for the next hand: reshuffles it if the cut card has
+        been dealt, and marks the cards dealt from here on as in play.
+        """
+        if self.cut_card_reached:
+            self.shuffle()
+        self.hand_start = self.cursor
+
+    def _reshuffle_discards(self) -> None:
+        """
+        Shuffles the cards dealt before the hand in play back into the shoe,
+        keeping the cards in play out of it.
+        """
+        if self.hand_start == 0:  # Every card is in play
+            self.shuffle()
+            return
+
+        in_play: array = self.cards[self.hand_start :]
+        discards: array = self.cards[: self.hand_start]
+        self.rng.shuffle(discards)
+        self.cards[:] = in_play + discards
+
+        # Counters start again from the cards in play, which are already seen.
+        self.cursor = 0
+        for counter in self.counters:
+            counter.reset()
+        self.cursor = len(in_play)
+        self.hand_start = 0
+
+    def draw(self) -> int:
+        """
+        Deal the next card from the shoe.
+
+        :return: Code of the card dealt.
+        :rtype: int
+        """
+        if self.cursor == len(self.cards):  # Empty mid-hand
+            self._reshuffle_discards()
+
+        code: int = self.cards[self.cursor]
+        self.cursor += 1
+        return code
+
+    def pop(self) -> Card:
+        """
+        Deal the next card from the shoe as a shared `Card`.
+
+        :return: The card dealt.
+        :rtype: Card
+        """
+        return CARDS[self.draw()]
 
 
 def get_wager(money: int, wager: int = 0) -> int:
@@ -230,8 +469,8 @@ def get_wager(money: int, wager: int = 0) -> int:
 
 def describe_hands(
     curr_hand: int,
-    plr_hand: list,
-    dlr_hand: list,
+    plr_hand: "Hand",
+    dlr_hand: "Hand",
     hide_dealer: bool = True,
 ) -> None:
     """
@@ -242,9 +481,9 @@ def describe_hands(
     :param wager: Current amount wagered by player.
     :type wager: int
     :param plr_hand: The player's hand.
-    :type plr_hand: list
+    :type plr_hand: Hand
     :param dlr_hand: The dealer's hand.
-    :type dlr_hand: list
+    :type dlr_hand: Hand
     :param hide_dealer: Hide first card if 'True', defaults to True
     :type hide_dealer: bool, optional
     """
@@ -267,76 +506,92 @@ def describe_hands(
     draw_hand(plr_hand, hide_dealer=False)  # Draw hand
 
 
-def load_json_txt(path: str, key: str) -> dict:
+def sum_hand_value(hand: "Hand | list[Card]") -> int:
     """
-    Loads the game's text from a json file.
+    Calculates the current value of all card currently held in accordance with the rules
+    of blackjack.
 
-    :param path: Path to file
-    :type path: str
-    :param key: The name of the game 'blackjack.py' we want the text for.
-    :type key: str
-    :return: The text from the file specific to this game.
-    :rtype: dict
+    :param hand: The hand to be evaluated
+    :type hand: Hand | list[Card]
+    :return: The sum value of all cards
+    :rtype: int
     """
-    with open(file=path, mode="r", encoding="UTF-8") as read_file:
-        all_txt = json.load(read_file)
-        selected_txt: dict = all_txt.get(key)
+    if isinstance(hand, Hand):
+        return hand.value  # Kept up to date as cards are taken
 
-    return selected_txt
+    return hand_value(hand_state(hand))
 
 
-def sum_hand_value(hand: list[tuple[str, str]]) -> int:
+def hand_state(codes: list[int]) -> tuple[int, int]:
     """
-    Calculates the current value of all card currently held in accordance with the rules
-    of blackjack.
+    Returns the (hard_total, soft_ace_count) state of a hand of card codes.
 
-    :param hand: The hand to be evaluated
-    :type hand: list[tuple[str,str]]
-    :return: The sum value of all cards
+    :param codes: Card codes of the hand.
+    :type codes: list[int]
+    :return: Total counting aces as 1, and the number of aces.
+    :rtype: tuple[int, int]
+    """
+    state: tuple[int, int] = (0, 0)
+    for code in codes:
+        state = add_card(state, code)
+
+    return state
+
+
+def add_card(state: tuple[int, int], code: int) -> tuple[int, int]:
+    """
+    Updates the (hard_total, soft_ace_count) state of a hand with a new card.
+
+    :param state: State of the hand before the card.
+    :type state: tuple[int, int]
+    :param code: Code of the card taken.
+    :type code: int
+    :return: State of the hand with the card.
+    :rtype: tuple[int, int]
+    """
+    return state[0] + CARD_VALUES[code], state[1] + (code in ACE_CODES)
+
+
+def hand_value(state: tuple[int, int]) -> int:
+    """
+    Looks up the best value of a hand from its (hard_total, soft_ace_count) state.
+    At most one ace can count 11 without busting.
+
+    :param state: State of the hand.
+    :type state: tuple[int, int]
+    :return: The value of the hand.
     :rtype: int
     """
-    value: int = 0
-    num_aces: int = 0
+    hard, aces = state
+    if hard > MAX_HARD_TOTAL:
+        return hard
 
-    for card in hand:
-        if card[0] in ["K", "Q", "J"]:
-            value += 10
-        elif card[0] == "A":  # Add 1 for each Ace
-            value += 1
-            num_aces += 1
-        else:
-            value += int(card[0])
+    return HAND_VALUES[hard][aces > 0]
 
-    for i in range(1, num_aces + 1):
-        while value + 10 <= 21:
-            value += 10  # Add an additional 10 for each ace if possible
 
-    return value
+def is_soft(state: tuple[int, int]) -> bool:
+    """
+    Check if a hand in (hard_total, soft_ace_count) state counts an ace as 11.
 
+    :param state: State of the hand.
+    :type state: tuple[int, int]
+    :return: True if the hand is soft.
+    :rtype: bool
+    """
+    hard, aces = state
+    return hard <= MAX_HARD_TOTAL and SOFT_HANDS[hard][aces > 0]
 
-def draw_hand(hand: list[tuple[str, str]], hide_dealer: bool) -> None:
+
+def draw_hand(hand: "Hand", hide_dealer: bool) -> None:
     """
     Draws a visual represntation of the cards in a hand.
 
     :param hand: The hand being drawn as art.
-    :type hand: list[tuple[str, str]]
+    :type hand: Hand
     :param hide_dealer: Hides the first card in the hand.
     :type hide_dealer: bool
     """
-    rows = ["", "", "", "", ""]
-
-    for card in hand:
-        rows[0] += " ___  "  # Top edge of card
-        if (hide_dealer) & (card is hand[0]):  # Hide first card
-            rows[1] += "|## | "
-            rows[2] += "|###| "
-            rows[3] += "|_##| "
-        else:
-            rows[1] += f"|{card[0]:<2} | "  # Rank to 2 digits
-            rows[2] += f"| {card[1]} | "  # Suit
-            rows[3] += f"|_{card[0]:_>2}| "  # Rank to 2 digits and bottom edge
-
-    [print(row) for row in rows]  # Draws card to screen
+    print(hand.art(hide_dealer))  # Draws card to screen
 
 
 def get_player_move(player_hand: list, money, wager) -> str:
@@ -368,24 +623,26 @@ def get_player_move(player_hand: list, money, wager) -> str:
 
 
 def take_card(
-    deck: list, hand: list[tuple[str, str]], owner: Literal["player", "dealer"]
+    deck: "list[Card] | Shoe",
+    hand: "Hand",
+    owner: Literal["player", "dealer"],
 ) -> list:
     """
     Draw a card from the deck and add it to the hand provide, print details regarding the card drawn, and return updated hand.
 
-    :param deck: The deck of cards being drawn from.
-    :type deck: list
+    :param deck: The deck or shoe of cards being drawn from.
+    :type deck: list[Card] | Shoe
     :param hand: The hand (player or dealer) receiving the new card.
-    :type hand: list[tuple[str, str]]
+    :type hand: Hand
     :param owner: Ownership of hand.
     :type owner: Literal["player", "dealer"]
     :return: Updated hand.
     :rtype: list
     """
-    hand.append(deck.pop())
-    rank, suit = hand[-1]
+    card: Card = deck.pop()
+    hand.append(card)
 
-    message = ["", f"a {rank} of {suit} from the deck.\n"]
+    message = ["", f"a {card.rank} of {card.suit} from the deck.\n"]
 
     if owner == "player":
         message[0] = "\nYou take"
@@ -406,9 +663,20 @@ def get_outcome(plr_hand: list, dlr_hand: list) -> str:
     :return: Player rusult. ('win', 'lose', 'tie')
     :rtype: str
     """
-    dealer_value: int = sum_hand_value(dlr_hand)
-    player_value: int = sum_hand_value(plr_hand)
+    return compare_values(sum_hand_value(plr_hand), sum_hand_value(dlr_hand))
+
+
+def compare_values(player_value: int, dealer_value: int) -> str:
+    """
+    Determine if player wins, loses, ot ties from the values of the hands.
 
+    :param player_value: Value of the player's cards at end of hand
+    :type player_value: int
+    :param dealer_value: Value of the dealer's cards at end of hand
+    :type dealer_value: int
+    :return: Player rusult. ('win', 'lose', 'tie')
+    :rtype: str
+    """
     if not player_value > 21:
         if player_value > dealer_value or dealer_value > 21:
             return "win"
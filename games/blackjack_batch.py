@@ -0,0 +1,461 @@
+"""blackjack_batch.py -- John Michael Jarvis JMJarvis1@icloud.com
+
+Plays thousands of independent games of blackjack.py side by side. The state
+of every table (its shoe, the player's money and wager, and both hands) is
+kept in NumPy arrays, one entry per table, and each step of a hand - deal,
+player moves, dealer draws, settling up - is applied to all tables at once.
+A table whose player runs out of money drops out of play, so after a run the
+share of ruined tables estimates the probability of ruin.
+
+A policy is a callable taking arrays of the player's totals, soft flags,
+dealer card values (1 for an ace) and whether doubling down is allowed, and
+returning an array of move codes in the order of `blackjack_strategy.MOVES`.
+Lookup tables and the one-hand strategies of blackjack_sim.py can be turned
+into policies with `table_policy` and `strategy_policy`.
+
+Given a counting system, each table also keeps the running count of its shoe,
+as `blackjack_count.CardCounter` does, so wagers can follow the true count.
+"""
+
+import argparse
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from blackjack import CARD_VALUES, MAX_HARD_TOTAL, MONEY, PENETRATION
+from blackjack_count import DECK_SIZE, TAG_TABLES
+from blackjack_strategy import (
+    HEADER_SIZE,
+    MOVES,
+    NUM_TOTALS,
+    NUM_UP_CARDS,
+    basic_table,
+)
+
+HIT, STAND, DOUBLE = range(3)  # Move codes, as in blackjack_strategy.MOVES
+
+VALUES: np.ndarray = np.array(CARD_VALUES, dtype=np.int8)  # Value of each card code
+
+Policy = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+
+@dataclass
+class BatchResult:
+    """Summary of a batch of simulated games."""
+
+    hands: int  # Hands played at each table
+    money: np.ndarray  # Final bankroll of each table
+    ruin_hands: np.ndarray  # Hand on which each table ran out of money (0 if never)
+
+    @property
+    def ruin_probability(self) -> float:
+        """Share of tables that ran out of money."""
+        return float(np.count_nonzero(self.ruin_hands)) / self.ruin_hands.size
+
+
+class BatchTables:
+    """
+    The state of N blackjack tables, stored as one array per field.
+    """
+
+    def __init__(
+        self,
+        num_tables: int,
+        num_decks: int = 6,
+        penetration: float = PENETRATION,
+        money: int = MONEY,
+        seed: int | None = None,
+        system: str | None = None,
+    ) -> None:
+        """
+        :param num_tables: Number of tables to play.
+        :type num_tables: int
+        :param num_decks: Number of decks in each table's shoe, defaults to 6
+        :type num_decks: int, optional
+        :param penetration: Share of a shoe dealt before reshuffling, defaults to PENETRATION
+        :type penetration: float, optional
+        :param money: Starting bankroll of each player, defaults to MONEY
+        :type money: int, optional
+        :param seed: Seed for reproducible runs, defaults to None
+        :type seed: int | None, optional
+        :param system: Card counting system to keep the count of, from
+            blackjack_count.TAG_TABLES, defaults to None (no count)
+        :type system: str | None, optional
+        """
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.rows: np.ndarray = np.arange(num_tables)
+
+        # Shoes of card codes, one row per table, dealt by moving a cursor.
+        self.shoes: np.ndarray = self.rng.permuted(
+            np.tile(
+                np.arange(len(CARD_VALUES), dtype=np.uint8), (num_tables, num_decks)
+            ),
+            axis=1,
+        )
+        self.cursors: np.ndarray = np.zeros(num_tables, dtype=np.int64)
+        self.hand_starts: np.ndarray = np.zeros(num_tables, dtype=np.int64)
+        self.cut_card: int = int(self.shoes.shape[1] * penetration)
+
+        self.money: np.ndarray = np.full(num_tables, money, dtype=np.int64)
+        self.playing: np.ndarray = np.ones(num_tables, dtype=bool)  # Not yet broke
+
+        # Running count of each shoe, and the tag of each card code.
+        self.running: np.ndarray | None = None
+        if system is not None:
+            self.tags: np.ndarray = np.array(TAG_TABLES[system], dtype=np.int64)[
+                VALUES - 1
+            ]
+            self.running = np.zeros(num_tables, dtype=np.int64)
+
+    def true_counts(self) -> np.ndarray:
+        """
+        :return: Running count per deck left to deal at each table, truncated
+            toward zero as in `blackjack_count.CardCounter.true_count`.
+        :rtype: np.ndarray
+        """
+        left: np.ndarray = np.maximum(self.shoes.shape[1] - self.cursors, 1)
+        return np.trunc(self.running * DECK_SIZE / left).astype(np.int64)
+
+    def shuffle(self, tables: np.ndarray) -> None:
+        """
+        Returns all cards to the shoes of some tables and shuffles them.
+
+        :param tables: Boolean mask of the tables to reshuffle.
+        :type tables: np.ndarray
+        """
+        if tables.any():
+            self.shoes[tables] = self.rng.permuted(self.shoes[tables], axis=1)
+            self.cursors[tables] = 0
+            self.hand_starts[tables] = 0
+            if self.running is not None:
+                self.running[tables] = 0
+
+    def reshuffle_discards(self, tables: np.ndarray) -> None:
+        """
+        Shuffles the cards dealt before the hand in play back into the shoes of
+        some tables, keeping the cards in play out of them. Only needed when a
+        shoe runs out mid-hand, so the tables are handled one at a time.
+
+        :param tables: Boolean mask of the tables to reshuffle.
+        :type tables: np.ndarray
+        """
+        for table in np.flatnonzero(tables):
+            start: int = int(self.hand_starts[table])
+            shoe: np.ndarray = self.shoes[table]
+            if start == 0:  # Every card is in play
+                shoe[:] = self.rng.permutation(shoe)
+                self.cursors[table] = 0
+                if self.running is not None:
+                    self.running[table] = 0
+                continue
+
+            in_play: np.ndarray = shoe[start:].copy()
+            shoe[len(in_play) :] = self.rng.permutation(shoe[:start])
+            shoe[: len(in_play)] = in_play
+            self.cursors[table] = len(in_play)
+            self.hand_starts[table] = 0
+            if self.running is not None:  # Start again from the cards in play
+                self.running[table] = self.tags[in_play].sum()
+
+    def draw(self, tables: np.ndarray) -> np.ndarray:
+        """
+        Deals the next card from the shoes of some tables.
+
+        :param tables: Boolean mask of the tables taking a card.
+        :type tables: np.ndarray
+        :return: Value of the card dealt at each table (0 where none was dealt).
+        :rtype: np.ndarray
+        """
+        empty: np.ndarray = tables & (self.cursors == self.shoes.shape[1])
+        if empty.any():  # Empty mid-hand
+            self.reshuffle_discards(empty)
+
+        codes: np.ndarray = self.shoes[
+            self.rows, np.minimum(self.cursors, self.shoes.shape[1] - 1)
+        ]
+        self.cursors += tables
+        if self.running is not None:
+            self.running += np.where(tables, self.tags[codes], 0)
+
+        return np.where(tables, VALUES[codes], 0)
+
+    def play_hand(self, wager: int | np.ndarray, policy: Policy) -> np.ndarray:
+        """
+        Plays one hand at every table that is still in play, following the
+        rules of `blackjack.main`, and settles the wagers.
+
+        :param wager: Wager of each player, or of the player at each table
+            (limited to their money).
+        :type wager: int | np.ndarray
+        :param policy: The player's policy.
+        :type policy: Policy
+        :return: Money won (or lost) at each table.
+        :rtype: np.ndarray
+        """
+        tables: np.ndarray = self.playing.copy()
+        self.shuffle(tables & (self.cursors >= self.cut_card))
+        self.hand_starts[tables] = self.cursors[tables]
+        wagers: np.ndarray = np.where(tables, np.minimum(wager, self.money), 0)
+
+        # Deal hands: player, player, dealer (hidden), dealer (face up).
+        cards: list[np.ndarray] = [self.draw(tables) for i in range(4)]
+        player_hard: np.ndarray = cards[0] + cards[1]
+        player_ace: np.ndarray = (cards[0] == 1) | (cards[1] == 1)
+        up_values: np.ndarray = cards[3]
+        dealer_hard: np.ndarray = cards[2] + cards[3]
+        dealer_ace: np.ndarray = (cards[2] == 1) | (cards[3] == 1)
+
+        # Player moves until every table has stood, doubled down or busted.
+        deciding: np.ndarray = tables.copy()
+        can_double: np.ndarray = tables.copy()
+        while deciding.any():
+            player_values: np.ndarray = hand_values(player_hard, player_ace)
+            moves: np.ndarray = policy(
+                player_values, is_soft(player_hard, player_ace), up_values, can_double
+            )
+            moves = np.where((moves == DOUBLE) & ~can_double, HIT, moves)
+
+            taking: np.ndarray = deciding & (moves != STAND)
+            card_values: np.ndarray = self.draw(taking)
+            player_hard += card_values
+            player_ace |= card_values == 1
+            wagers = np.where(deciding & (moves == DOUBLE), 2 * wagers, wagers)
+
+            can_double[:] = False
+            deciding &= (moves == HIT) & (hand_values(player_hard, player_ace) <= 21)
+
+        player_values = hand_values(player_hard, player_ace)
+
+        # Dealer draws to 17 unless the player busted.
+        dealing: np.ndarray = tables & (player_values <= 21)
+        while True:
+            dealing &= hand_values(dealer_hard, dealer_ace) < 17
+            if not dealing.any():
+                break
+            card_values = self.draw(dealing)
+            dealer_hard += card_values
+            dealer_ace |= card_values == 1
+
+        results: np.ndarray = settle(
+            player_values, hand_values(dealer_hard, dealer_ace), wagers
+        )
+        self.money += results
+        self.playing &= self.money > 0
+
+        return results
+
+
+def hand_values(hard: np.ndarray, has_ace: np.ndarray) -> np.ndarray:
+    """
+    Best value of each hand, as `blackjack.hand_value`.
+
+    :param hard: Totals counting aces as 1.
+    :type hard: np.ndarray
+    :param has_ace: True where the hand holds an ace.
+    :type has_ace: np.ndarray
+    :return: The value of each hand.
+    :rtype: np.ndarray
+    """
+    return hard + 10 * is_soft(hard, has_ace)
+
+
+def is_soft(hard: np.ndarray, has_ace: np.ndarray) -> np.ndarray:
+    """
+    Check which hands count an ace as 11, as `blackjack.is_soft`.
+
+    :param hard: Totals counting aces as 1.
+    :type hard: np.ndarray
+    :param has_ace: True where the hand holds an ace.
+    :type has_ace: np.ndarray
+    :return: True where the hand is soft.
+    :rtype: np.ndarray
+    """
+    return has_ace & (hard + 10 <= 21)
+
+
+def settle(
+    player_values: np.ndarray, dealer_values: np.ndarray, wagers: np.ndarray
+) -> np.ndarray:
+    """
+    Money won (or lost) at each table, as `blackjack.compare_values` and
+    `blackjack.payout`: the wager is won or lost, and returned on a tie.
+
+    :param player_values: Value of each player's hand.
+    :type player_values: np.ndarray
+    :param dealer_values: Value of each dealer's hand.
+    :type dealer_values: np.ndarray
+    :param wagers: Each player's wager.
+    :type wagers: np.ndarray
+    :return: Change in each player's money.
+    :rtype: np.ndarray
+    """
+    player_busts: np.ndarray = player_values > 21
+    win: np.ndarray = ~player_busts & (
+        (player_values > dealer_values) | (dealer_values > 21)
+    )
+    lose: np.ndarray = player_busts | (~win & (player_values < dealer_values))
+
+    return wagers * (win.astype(np.int64) - lose)
+
+
+def table_policy(table: bytes) -> Policy:
+    """
+    Turns a binary table from blackjack_strategy into a policy.
+
+    :param table: The binary strategy table.
+    :type table: bytes
+    :return: The policy.
+    :rtype: Policy
+    """
+    cells: np.ndarray = np.frombuffer(table, dtype=np.uint8, offset=HEADER_SIZE)
+    cells = cells.reshape(2, NUM_TOTALS, NUM_UP_CARDS)
+
+    def policy(
+        totals: np.ndarray,
+        soft: np.ndarray,
+        up_values: np.ndarray,
+        can_double: np.ndarray,
+    ) -> np.ndarray:
+        cell: np.ndarray = cells[
+            soft.astype(np.intp), np.minimum(totals, 21), up_values - 1
+        ]
+        return np.where(can_double, cell & 0xF, cell >> 4)
+
+    return policy
+
+
+def strategy_policy(strategy: Callable[[int, bool, int, bool], str]) -> Policy:
+    """
+    Turns a strategy of blackjack_sim.py, which plays one hand at a time, into
+    a policy. The strategy must depend only on its arguments, as it is asked
+    once for every situation and its moves are looked up from then on.
+
+    :param strategy: The strategy.
+    :type strategy: Callable[[int, bool, int, bool], str]
+    :raises ValueError: Raised if the strategy returns an unknown move.
+    :return: The policy.
+    :rtype: Policy
+    """
+    # Move codes indexed by [can double, soft, total, dealer card value].
+    # Totals over 21 have busted, so are never asked about.
+    moves: np.ndarray = np.full(
+        (2, 2, MAX_HARD_TOTAL + 1, NUM_UP_CARDS + 1), STAND, dtype=np.int8
+    )
+    for double_index, can_double in enumerate((False, True)):
+        for soft_index, soft in enumerate((False, True)):
+            for total in range(NUM_TOTALS):
+                for up_value in range(1, NUM_UP_CARDS + 1):
+                    move: str = strategy(total, soft, up_value, can_double)
+                    if len(move) != 1 or move not in MOVES:
+                        raise ValueError(
+                            "An error occurred", "ValueError", f"move = {move}"
+                        )
+                    cell: tuple[int, ...] = (double_index, soft_index, total, up_value)
+                    moves[cell] = MOVES.index(move)
+
+    def policy(
+        totals: np.ndarray,
+        soft: np.ndarray,
+        up_values: np.ndarray,
+        can_double: np.ndarray,
+    ) -> np.ndarray:
+        return moves[
+            can_double.astype(np.intp), soft.astype(np.intp), totals, up_values
+        ]
+
+    return policy
+
+
+def simulate_tables(
+    num_tables: int,
+    num_hands: int,
+    wager: int = 100,
+    policy: Policy | None = None,
+    num_decks: int = 6,
+    money: int = MONEY,
+    seed: int | None = None,
+) -> BatchResult:
+    """
+    Plays a number of hands at many tables at once.
+
+    :param num_tables: Number of tables (independent players).
+    :type num_tables: int
+    :param num_hands: Hands to play at each table.
+    :type num_hands: int
+    :param wager: Wager of each hand, defaults to 100
+    :type wager: int, optional
+    :param policy: The players' policy, defaults to basic strategy
+    :type policy: Policy | None, optional
+    :param num_decks: Number of decks in each shoe, defaults to 6
+    :type num_decks: int, optional
+    :param money: Starting bankroll of each player, defaults to MONEY
+    :type money: int, optional
+    :param seed: Seed for reproducible runs, defaults to None
+    :type seed: int | None, optional
+    :return: Summary of the games.
+    :rtype: BatchResult
+    """
+    if policy is None:
+        policy = table_policy(basic_table(num_decks))
+
+    tables = BatchTables(num_tables, num_decks, money=money, seed=seed)
+    ruin_hands: np.ndarray = np.zeros(num_tables, dtype=np.int64)
+
+    for hand_num in range(1, num_hands + 1):
+        if not tables.playing.any():
+            break
+        was_playing: np.ndarray = tables.playing.copy()
+        tables.play_hand(wager, policy)
+        ruin_hands[was_playing & ~tables.playing] = hand_num
+
+    return BatchResult(num_hands, tables.money, ruin_hands)
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    result: BatchResult = simulate_tables(
+        args.tables, args.hands, args.wager, num_decks=args.decks, seed=args.seed
+    )
+
+    print(f"Tables:              {args.tables:,}")
+    print(f"Hands per table:     {args.hands:,}")
+    print(f"Average bankroll:    ${result.money.mean():,.2f} (from ${MONEY:,})")
+    print(f"Probability of ruin: {result.ruin_probability:.2%}")
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options for the simulation.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Batched blackjack tables.")
+    parser.add_argument(
+        "--tables", type=int, default=100_000, help="Number of tables to play."
+    )
+    parser.add_argument(
+        "--hands", type=int, default=1_000, help="Hands to play at each table."
+    )
+    parser.add_argument("--wager", type=int, default=100, help="Wager of each hand.")
+    parser.add_argument(
+        "--decks", type=int, default=6, help="Number of decks in each shoe (1-8)."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed for reproducible runs."
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    for option in ("tables", "hands", "wager"):
+        if getattr(args, option) < 1:
+            parser.error(f"--{option} must be at least 1")
+    if args.decks not in range(1, 9):
+        parser.error("--decks must be between 1 and 8")
+
+    return args
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""blackjack_count.py -- John Michael Jarvis JMJarvis1@icloud.com
+
+Card counting for blackjack.py. A counting system gives every card value a
+tag, and the running count is the sum of the tags of every card dealt since
+the shoe was shuffled. Dividing the running count by the number of decks left
+to deal gives the true count, which is what a counter's wagers are based on.
+
+A `CardCounter` is attached to a `blackjack.Shoe` and sees every card that
+leaves it - the initial deal, cards taken with `take_card` and the dealer's
+draws alike - without the shoe doing any work per card. Instead, the counter
+catches up on the cards dealt since it was last read, translating the dealt
+card codes to tags in a single `bytes.translate` call, and is reset by the
+shoe whenever it is shuffled.
+"""
+
+from collections.abc import Callable
+
+from blackjack import CARD_VALUES, Shoe
+
+# Tag of each card value, ace first and ten-valued cards last.
+TAG_TABLES: dict[str, tuple[int, ...]] = {
+    "hi-lo": (-1, 1, 1, 1, 1, 1, 0, 0, 0, -1),
+    "ko": (-1, 1, 1, 1, 1, 1, 1, 0, 0, -1),
+    "hi-opt-i": (0, 0, 1, 1, 1, 1, 0, 0, 0, -1),
+    "hi-opt-ii": (0, 1, 1, 2, 2, 1, 1, 0, 0, -2),
+    "omega-ii": (0, 1, 1, 2, 2, 2, 1, 0, -1, -2),
+    "zen": (-1, 1, 1, 2, 2, 2, 1, 0, 0, -2),
+}
+TAG_OFFSET: int = 128  # Added to tags so they can be stored as bytes
+DECK_SIZE: int = len(CARD_VALUES)
+
+WagerPolicy = Callable[[int], int]
+
+
+class CardCounter:
+    """
+    The running and true count of the cards dealt from a shoe.
+    """
+
+    __slots__ = ("shoe", "tags", "_table", "_running", "_seen")
+
+    def __init__(self, shoe: Shoe, system: str | tuple[int, ...] = "hi-lo") -> None:
+        """
+        :param shoe: The shoe to count.
+        :type shoe: Shoe
+        :param system: Name of a system in TAG_TABLES, or the tag of each card
+            value (ace first), defaults to "hi-lo"
+        :type system: str | tuple[int, ...], optional
+        :raises ValueError: Raised if the system is unknown or the tags are invalid.
+        """
+        tags: tuple[int, ...] = (
+            TAG_TABLES.get(system) if isinstance(system, str) else tuple(system)
+        )
+        if (
+            tags is None
+            or len(tags) != 10
+            or any(abs(tag) >= TAG_OFFSET for tag in tags)
+        ):
+            raise ValueError("An error occurred", "ValueError", f"system = {system}")
+
+        self.shoe: Shoe = shoe
+        self.tags: tuple[int, ...] = tags
+
+        # Offset tag of each card code, indexed by code.
+        self._table: bytes = bytes(
+            TAG_OFFSET + tags[value - 1] for value in CARD_VALUES
+        ).ljust(256, b"\0")
+        self._running: int = 0
+        self._seen: int = shoe.cursor  # Position in the shoe counted up to
+        shoe.counters.append(self)
+
+    def reset(self) -> None:
+        """Starts counting again from a freshly shuffled shoe."""
+        self._running = 0
+        self._seen = self.shoe.cursor
+
+    def detach(self) -> None:
+        """Stops counting the shoe."""
+        self.shoe.counters.remove(self)
+
+    @property
+    def running_count(self) -> int:
+        """Sum of the tags of every card dealt since the shuffle."""
+        cursor: int = self.shoe.cursor
+        if cursor != self._seen:
+            dealt: bytes = self.shoe.cards[self._seen : cursor].tobytes()
+            self._running += sum(dealt.translate(self._table)) - TAG_OFFSET * len(dealt)
+            self._seen = cursor
+
+        return self._running
+
+    @property
+    def true_count(self) -> int:
+        """Running count per deck left to deal, truncated toward zero as in Hi-Lo."""
+        running: int = self.running_count
+        return int(running * DECK_SIZE / max(len(self.shoe), 1))
+
+
+def bet_ramp(wager: int, spread: int) -> WagerPolicy:
+    """
+    Creates a wager policy that bets one unit at a true count of 1 or less and
+    one more unit for every point above that, up to `spread` units.
+
+    :param wager: Size of a unit.
+    :type wager: int
+    :param spread: Largest bet, in units.
+    :type spread: int
+    :return: The wager policy.
+    :rtype: WagerPolicy
+    """
+
+    def policy(true_count: int) -> int:
+        return wager * max(1, min(spread, true_count))
+
+    return policy
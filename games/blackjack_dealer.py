@@ -0,0 +1,170 @@
+"""blackjack_dealer.py -- John Michael Jarvis JMJarvis1@icloud.com
+
+Exact probabilities of the dealer's final total in blackjack.py. Given the
+dealer's face-up card and the cards left to draw from, every way the dealer
+can play out the hand (standing at 17 or higher, as in `blackjack.main`) is
+followed and weighted by its chance of being drawn.
+
+The cards left are described by a tuple of 10 counts: the number of aces,
+twos, ..., nines, and ten-valued cards (10, J, Q, K). Results are memoized
+on (hand state, counts) in an LRU cache of CACHE_SIZE entries, so repeated
+queries against the same shoe are answered from the cache.
+"""
+
+import argparse
+from functools import lru_cache
+
+from blackjack import CARD_VALUES, NUM_DECKS, hand_value
+
+DEALER_TOTALS: tuple[str, ...] = ("17", "18", "19", "20", "21", "bust")
+CACHE_SIZE: int = 1 << 16  # Entries kept by the LRU cache
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+    counts: tuple[int, ...] = shoe_counts(args.decks)
+
+    print(f"Dealer's final total with {args.decks} deck(s):\n")
+    print("Up card" + "".join(f"{total:>9}" for total in DEALER_TOTALS))
+    for up_value in range(1, 11):
+        distribution = dealer_distribution(up_value, remove_cards(counts, [up_value]))
+        label: str = "A" if up_value == 1 else str(up_value)
+        print(f"{label:>7}" + "".join(f"{chance:>9.2%}" for chance in distribution))
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Dealer outcome probabilities.")
+    parser.add_argument(
+        "--decks", type=int, default=NUM_DECKS, help="Number of decks in the shoe."
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.decks < 1:
+        parser.error("--decks must be at least 1")
+
+    return args
+
+
+def shoe_counts(num_decks: int = NUM_DECKS) -> tuple[int, ...]:
+    """
+    Returns the card counts of a full shoe.
+
+    :param num_decks: Number of decks in the shoe, defaults to NUM_DECKS
+    :type num_decks: int, optional
+    :return: Number of cards of each value (ace first, ten-valued last).
+    :rtype: tuple[int, ...]
+    """
+    return tuple(4 * num_decks for value in range(1, 10)) + (16 * num_decks,)
+
+
+def remove_cards(counts: tuple[int, ...], values: list[int]) -> tuple[int, ...]:
+    """
+    Removes cards that have been seen from the card counts.
+
+    :param counts: Number of cards of each value.
+    :type counts: tuple[int, ...]
+    :param values: Values of the cards to remove (1 for an ace).
+    :type values: list[int]
+    :raises ValueError: Raised if a card is not left in the counts.
+    :return: The updated counts.
+    :rtype: tuple[int, ...]
+    """
+    remaining: list[int] = list(counts)
+    for value in values:
+        if remaining[value - 1] == 0:
+            raise ValueError("An error occurred", "ValueError", f"value = {value}")
+        remaining[value - 1] -= 1
+
+    return tuple(remaining)
+
+
+def counts_from_codes(codes) -> tuple[int, ...]:
+    """
+    Returns the card counts of a collection of card codes, such as the undealt
+    part of a `blackjack.Shoe` (`shoe.cards[shoe.cursor:]`).
+
+    :param codes: Card codes.
+    :return: Number of cards of each value.
+    :rtype: tuple[int, ...]
+    """
+    counts: list[int] = [0] * 10
+    for code in codes:
+        counts[CARD_VALUES[code] - 1] += 1
+
+    return tuple(counts)
+
+
+def dealer_distribution(up_value: int, counts: tuple[int, ...]) -> tuple[float, ...]:
+    """
+    Calculates the probability of each final dealer total.
+
+    :param up_value: Value of the dealer's face-up card (1 for an ace).
+    :type up_value: int
+    :param counts: Cards the hole card and any hits are drawn from, with the
+        up card (and any other seen cards) already removed.
+    :type counts: tuple[int, ...]
+    :return: Probabilities in the order of DEALER_TOTALS.
+    :rtype: tuple[float, ...]
+    """
+    return _dealer_outcomes(up_value, up_value == 1, counts)
+
+
+def cache_info():
+    """Hit, miss and size statistics of the dealer outcome cache."""
+    return _dealer_outcomes.cache_info()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _dealer_outcomes(
+    hard: int, has_ace: bool, counts: tuple[int, ...]
+) -> tuple[float, ...]:
+    """
+    Probability of each final dealer total from a (hard total, ace) state.
+
+    :param hard: Dealer's total counting aces as 1.
+    :type hard: int
+    :param has_ace: True if the dealer holds an ace.
+    :type has_ace: bool
+    :param counts: Number of cards of each value left to draw.
+    :type counts: tuple[int, ...]
+    :raises ValueError: Raised if the cards run out before the dealer stands.
+    :return: Probabilities in the order of DEALER_TOTALS.
+    :rtype: tuple[float, ...]
+    """
+    value: int = hand_value((hard, has_ace))
+    if value >= 17:  # Dealer stands
+        outcomes: list[float] = [0.0] * len(DEALER_TOTALS)
+        outcomes[value - 17 if value <= 21 else -1] = 1.0
+        return tuple(outcomes)
+
+    cards_left: int = sum(counts)
+    if cards_left == 0:
+        raise ValueError("An error occurred", "ValueError", "no cards left to draw")
+
+    outcomes = [0.0] * len(DEALER_TOTALS)
+    remaining: list[int] = list(counts)
+    for card_value, count in enumerate(counts, start=1):
+        if count == 0:
+            continue
+
+        remaining[card_value - 1] -= 1
+        next_outcomes: tuple[float, ...] = _dealer_outcomes(
+            hard + card_value, has_ace or card_value == 1, tuple(remaining)
+        )
+        remaining[card_value - 1] += 1
+
+        chance: float = count / cards_left
+        for index, probability in enumerate(next_outcomes):
+            outcomes[index] += chance * probability
+
+    return tuple(outcomes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""blackjack_server.py -- John Michael Jarvis JMJarvis1@icloud.com
+
+A multi-player blackjack server built on the rules of blackjack.py. Players
+connect over TCP and are seated at tables of up to SEATS_PER_TABLE players
+who share one dealer and one shoe. Each table plays its rounds as an asyncio
+task: every seated player is asked for a wager, takes their turn in seat
+order, and is settled against the dealer's hand.
+
+The protocol is plain text, one message per line, so a session can be
+played by hand with `nc`. Lines sent by the server start with a keyword:
+
+    WELCOME <table> <seat>      Seated at a table
+    RULES <line>                A line of the rules, sent after WELCOME
+    WAGER? <money>              Reply with a wager (0 or blank sits out)
+    DEALER <card>               The dealer's face-up card
+    DEALER <value> <cards>      The dealer's final hand
+    HAND <value> <cards>        The player's hand
+    MOVE? <moves>               Reply with H, S, D (if offered) or Q to quit
+    CARD <message>              A card was taken
+    RESULT <outcome> <wager> <money>
+    BYE <reason>                The server is closing the connection
+
+A player who does not answer within the read timeout sits out the round (or
+stands, if asked for a move), and a player who leaves during a round loses
+their wager. Players who sit down during a round join in from the next one.
+The same module runs a load generator that opens many client connections to
+benchmark a server.
+"""
+
+import argparse
+import asyncio
+import time
+
+from blackjack import (
+    MONEY,
+    TEXT_KEY,
+    Hand,
+    Shoe,
+    get_outcome,
+    payout,
+    sum_hand_value,
+    take_card,
+)
+import resources  # On the path once blackjack is imported
+
+HOST: str = "127.0.0.1"
+PORT: int = 2121
+SEATS_PER_TABLE: int = 5
+SHOE_DECKS: int = 6  # Decks in each table's shoe
+DEALER_DELAY: float = 2.0  # Seconds between dealer moves
+READ_TIMEOUT: float = 30.0  # Seconds a player has to answer
+RULES_WIDTH: int = 72  # Width the rules are wrapped to
+QUEUED_LINES: int = 16  # Lines read ahead from each player
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    if args.command == "serve":
+        server = BlackjackServer(args.delay, args.timeout)
+        asyncio.run(server.serve(args.host, args.port))
+    else:
+        asyncio.run(run_load(args.host, args.port, args.clients, args.hands, args.idle))
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Multi-player blackjack server.")
+    parser.add_argument("--host", default=HOST, help="Address to serve on.")
+    parser.add_argument("--port", type=int, default=PORT, help="Port to serve on.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the server.")
+    serve.add_argument(
+        "--delay",
+        type=float,
+        default=DEALER_DELAY,
+        help="Seconds between dealer moves.",
+    )
+    serve.add_argument(
+        "--timeout",
+        type=float,
+        default=READ_TIMEOUT,
+        help="Seconds a player has to answer.",
+    )
+
+    load = commands.add_parser("loadgen", help="Benchmark a running server.")
+    load.add_argument("--clients", type=int, default=1_000, help="Connections to open.")
+    load.add_argument("--hands", type=int, default=10, help="Hands each client plays.")
+    load.add_argument(
+        "--idle",
+        action="store_true",
+        help="Connect and never answer, to measure idle connections.",
+    )
+
+    return parser.parse_args()
+
+
+class Seat:
+    """A connected player."""
+
+    __slots__ = (
+        "reader",
+        "writer",
+        "money",
+        "wager",
+        "hand",
+        "left",
+        "lines",
+        "listener",
+    )
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.money: int = MONEY
+        self.wager: int = 0
+        self.hand: Hand = Hand()
+        self.left: asyncio.Event = asyncio.Event()  # Set when the player leaves
+        self.lines: asyncio.Queue[bytes] = asyncio.Queue(QUEUED_LINES)
+        self.listener: asyncio.Task = asyncio.create_task(self.listen())
+
+    def send(self, message: str) -> None:
+        """Queues a line to the player."""
+        self.writer.write(message.encode("UTF-8") + b"\n")
+
+    async def listen(self) -> None:
+        """Queues each line from the player, then an empty line when they leave."""
+        try:
+            while line := await self.reader.readline():
+                await self.lines.put(line)
+        except (ConnectionError, ValueError):  # ValueError: line over the limit
+            pass
+        await self.lines.put(b"")
+
+    async def ask(self, prompt: str, timeout: float) -> str | None:
+        """
+        Sends a prompt and waits for the player's answer.
+
+        :param prompt: The prompt line.
+        :type prompt: str
+        :param timeout: Seconds to wait for the answer.
+        :type timeout: float
+        :raises ConnectionError: Raised if the player has disconnected.
+        :return: The answer in upper case, or None if the player did not answer.
+        :rtype: str | None
+        """
+        # Drop answers that came in after an earlier prompt timed out
+        while not self.lines.empty():
+            if not self.lines.get_nowait():
+                raise ConnectionError("player disconnected")
+
+        self.send(prompt)
+        await self.writer.drain()
+        try:
+            line: bytes = await asyncio.wait_for(self.lines.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if not line:
+            raise ConnectionError("player disconnected")
+
+        return line.decode("UTF-8", errors="replace").strip().upper()
+
+
+class Table:
+    """A dealer and shoe shared by up to SEATS_PER_TABLE players."""
+
+    __slots__ = ("number", "seats", "round_seats", "shoe", "delay", "timeout", "task")
+
+    def __init__(self, number: int, delay: float, timeout: float) -> None:
+        self.number: int = number
+        self.seats: list[Seat] = []
+        self.round_seats: list[Seat] = []  # Seated when the current round began
+        self.shoe: Shoe = Shoe(SHOE_DECKS)
+        self.delay: float = delay
+        self.timeout: float = timeout
+        self.task: asyncio.Task | None = None
+
+    def sit(self, seat: Seat) -> None:
+        """Seats a player, starting the table if it was empty."""
+        self.seats.append(seat)
+        seat.send(f"WELCOME {self.number} {len(self.seats)}")
+        for line in resources.compile_text(TEXT_KEY, "rules", RULES_WIDTH).splitlines():
+            seat.send(f"RULES {line.rstrip()}")
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def leave(self, seat: Seat, reason: str) -> None:
+        """Removes a player from the table. A wager still in play is lost."""
+        if seat in self.seats:
+            self.seats.remove(seat)
+        if seat in self.round_seats:
+            self.round_seats.remove(seat)
+        forfeit: int = seat.wager  # Leaving mid-round loses the wager
+        seat.money = payout("lose", seat.money, forfeit)
+        seat.wager = 0
+        if not seat.writer.is_closing():
+            if forfeit:
+                seat.send(f"RESULT lose {forfeit} {seat.money}")
+            seat.send(f"BYE {reason}")
+        seat.left.set()
+
+    def broadcast(self, message: str) -> None:
+        """Sends a line to every player seated when the round began."""
+        for seat in self.round_seats:
+            seat.send(message)
+
+    async def run(self) -> None:
+        """Plays rounds for as long as anyone is seated."""
+        while self.seats:
+            await self.play_round()
+
+    async def play_round(self) -> None:
+        """Plays one round with every player who places a wager."""
+        self.round_seats = list(self.seats)
+        await asyncio.gather(*(self.take_wager(seat) for seat in self.round_seats))
+        players: list[Seat] = [seat for seat in self.round_seats if seat.wager > 0]
+        if not players:
+            return
+
+        self.shoe.start_hand()
+
+        for seat in players:
+            seat.hand = Hand(self.shoe.pop() for i in range(2))
+        dealer_hand: Hand = Hand(self.shoe.pop() for i in range(2))
+        self.broadcast(f"DEALER {dealer_hand[1]}")  # First card is hidden
+
+        for seat in players:
+            await self.player_turn(seat)
+
+        # Dealer only plays if someone is still standing.
+        standing: list[Seat] = [
+            seat
+            for seat in players
+            if seat in self.seats and sum_hand_value(seat.hand) <= 21
+        ]
+        if standing:
+            while sum_hand_value(dealer_hand) < 17:
+                await asyncio.sleep(self.delay)  # Delay between moves
+                message: list = take_card(self.shoe, dealer_hand, "dealer")
+                self.broadcast("CARD " + " ".join(message).strip())
+
+        self.broadcast(
+            f"DEALER {sum_hand_value(dealer_hand)} " + " ".join(map(str, dealer_hand))
+        )
+        for seat in players:
+            if seat not in self.seats:
+                continue
+            outcome: str = get_outcome(seat.hand, dealer_hand)
+            seat.money = payout(outcome, seat.money, seat.wager)
+            seat.send(f"RESULT {outcome} {seat.wager} {seat.money}")
+            seat.wager = 0  # Settled
+            if seat.money <= 0:
+                self.leave(seat, "broke")
+
+    async def take_wager(self, seat: Seat) -> None:
+        """Asks a player for their wager. No valid answer sits them out."""
+        seat.wager = 0
+        try:
+            answer: str | None = await seat.ask(f"WAGER? {seat.money}", self.timeout)
+        except ConnectionError:
+            self.leave(seat, "disconnected")
+            return
+
+        if answer is not None and answer.isdigit() and int(answer) <= seat.money:
+            seat.wager = int(answer)
+
+    async def player_turn(self, seat: Seat) -> None:
+        """Plays a player's hand until they stand, double down or bust."""
+        player_move: str = ""
+        while player_move not in ["S", "D"]:
+            seat.send(
+                f"HAND {sum_hand_value(seat.hand)} " + " ".join(map(str, seat.hand))
+            )
+            moves: str = "H S D" if len(seat.hand) == 2 else "H S"
+            try:
+                answer: str | None = await seat.ask(f"MOVE? {moves}", self.timeout)
+            except ConnectionError:
+                self.leave(seat, "disconnected")
+                return
+
+            player_move = (answer or "S")[:1]  # Stand if no answer
+            if player_move == "Q":
+                self.leave(seat, "quit")
+                return
+            if player_move not in moves.split():
+                player_move = ""
+                continue
+
+            if player_move in ["H", "D"]:
+                message: list = take_card(self.shoe, seat.hand, "player")
+                seat.send("CARD " + " ".join(message).strip())
+                if player_move == "D":
+                    seat.wager = min(2 * seat.wager, seat.money)
+
+            if sum_hand_value(seat.hand) > 21:  # Player busts
+                break
+
+        seat.send(f"HAND {sum_hand_value(seat.hand)} " + " ".join(map(str, seat.hand)))
+
+
+class BlackjackServer:
+    """Accepts connections and seats players at tables."""
+
+    def __init__(
+        self, delay: float = DEALER_DELAY, timeout: float = READ_TIMEOUT
+    ) -> None:
+        self.delay: float = delay
+        self.timeout: float = timeout
+        self.tables: list[Table] = []
+
+    async def serve(self, host: str = HOST, port: int = PORT) -> None:
+        """Serves players until cancelled."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving blackjack on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Seats a new player and waits until they leave."""
+        seat = Seat(reader, writer)
+        self.find_table().sit(seat)
+        try:
+            await seat.left.wait()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            seat.listener.cancel()
+            writer.close()
+
+    def find_table(self) -> Table:
+        """Returns a table with a free seat, opening a new one if needed."""
+        for table in self.tables:
+            if len(table.seats) < SEATS_PER_TABLE:
+                return table
+
+        table = Table(len(self.tables) + 1, self.delay, self.timeout)
+        self.tables.append(table)
+        return table
+
+
+async def run_load(host: str, port: int, clients: int, hands: int, idle: bool) -> None:
+    """
+    Opens many client connections to a server and reports the throughput.
+
+    :param host: Address of the server.
+    :type host: str
+    :param port: Port of the server.
+    :type port: int
+    :param clients: Number of connections to open.
+    :type clients: int
+    :param hands: Hands each client plays before disconnecting.
+    :type hands: int
+    :param idle: Hold the connections without answering, until interrupted.
+    :type idle: bool
+    """
+    import resource  # Unix only, so the server still runs on Windows
+
+    start: float = time.perf_counter()
+    results: list = await asyncio.gather(
+        *(load_client(host, port, hands, idle) for i in range(clients)),
+        return_exceptions=True,
+    )
+    elapsed: float = time.perf_counter() - start
+
+    played: list[int] = [result for result in results if isinstance(result, int)]
+    total_hands: int = sum(played)
+    peak_memory: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"Clients connected:  {len(played):,} of {clients:,}")
+    print(f"Hands played:       {total_hands:,} in {elapsed:.2f}s")
+    print(f"Throughput:         {total_hands / elapsed:,.1f} hands/s")
+    print(f"Client peak memory: {peak_memory / 1024:,.1f} MB")
+
+
+async def load_client(host: str, port: int, hands: int, idle: bool) -> int:
+    """
+    Plays as one client: wagers 10 and hits below 17.
+
+    :return: Number of hands played.
+    :rtype: int
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    played: int = 0
+    try:
+        while played < hands:
+            line: bytes = await reader.readline()
+            if not line or line.startswith(b"BYE"):
+                break
+            if idle:
+                continue
+
+            if line.startswith(b"WAGER?"):
+                writer.write(b"10\n")
+            elif line.startswith(b"HAND"):
+                value: int = int(line.split()[1])
+            elif line.startswith(b"MOVE?"):
+                writer.write(b"H\n" if value < 17 else b"S\n")
+            elif line.startswith(b"RESULT"):
+                played += 1
+    finally:
+        writer.close()
+
+    return played
+
+
+if __name__ == "__main__":
+    main()
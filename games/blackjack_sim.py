@@ -0,0 +1,491 @@
+"""blackjack_sim.py -- John Michael Jarvis JMJarvis1@icloud.com
+
+Headless self-play for blackjack.py. A strategy plays the part of the player
+in place of the keyboard, and the hands are dealt, played out by the dealer and
+settled with the same rules as the game. After many hands the simulation
+reports the strategy's expected value, its variance and whether (and when) a
+starting bankroll of MONEY would have been lost.
+
+A strategy is any callable taking the player's total, whether the hand is
+soft, the value of the dealer's face-up card (1 for an ace) and whether the
+player may still double down, and returning a move: "H" (hit), "S" (stand) or
+"D" (double down). Lookup tables keyed by (player total, soft hand, dealer
+card value) can be turned into a strategy with `table_strategy`.
+
+`simulate` plays its hands on the tables of blackjack_batch.py, thousands
+side by side, with the strategy turned into a lookup table once. With a wager
+policy, the wager of each hand is chosen from the true count of the table's
+shoe, as a card counter would.
+
+`count_curve` plays one hand at a time instead, dealing the integer codes of
+blackjack.py from a multi-deck `Shoe` and tracking hands as
+(hard_total, soft_ace_count) states. It plays flat wagers and splits the
+results by the true count of a `blackjack_count.CardCounter` before each
+hand, giving the expected value at each count. Its hands are played in
+shards, which can be spread over worker processes.
+"""
+
+import argparse
+import random
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from blackjack import (
+    CARD_VALUES,
+    MONEY,
+    PENETRATION,
+    Shoe,
+    add_card,
+    compare_values,
+    hand_value,
+    is_soft,
+    payout,
+)
+from blackjack_batch import BatchTables, Policy, strategy_policy
+from blackjack_count import TAG_TABLES, CardCounter, WagerPolicy, bet_ramp
+from blackjack_strategy import basic_table, lookup
+
+SHARD_HANDS: int = 100_000  # Hands played by each task of count_curve
+TABLES: int = 10_000  # Tables played side by side by simulate
+TABLE_MONEY: int = 1 << 62  # Bankroll of each table, so that none runs out
+MAX_TRUE_COUNT: int = 10  # True counts beyond this are grouped together
+
+Strategy = Callable[[int, bool, int, bool], str]
+
+
+@dataclass
+class SimulationResult:
+    """Summary of a simulated run of hands."""
+
+    hands: int  # Hands played
+    wager: int  # Base wager of each hand
+    wagered: int  # Sum of the wager placed on each hand, before doubling down
+    net: int  # Money won (or lost) over all hands
+    net_squared: int  # Sum of the squared result of each hand
+    unit_net: float  # Sum of the result of each hand over its wager
+    unit_squared: float  # Sum of the squared result of each hand over its wager
+    ruin_hand: int | None  # Hand on which the bankroll ran out, if it did
+    lowest_money: int  # Lowest bankroll reached
+
+    @property
+    def expected_value(self) -> float:
+        """Money won (or lost) per unit wagered, over all hands."""
+        return self.net / self.wagered
+
+    @property
+    def variance(self) -> float:
+        """Variance of the result of a hand, in units of its own wager."""
+        mean: float = self.unit_net / self.hands
+        return self.unit_squared / self.hands - mean**2
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    if args.curve:
+        display_curve(
+            count_curve(
+                args.strategy,
+                args.hands,
+                num_decks=args.decks,
+                system=args.system,
+                seed=args.seed,
+                workers=args.workers,
+            )
+        )
+        return
+
+    result: SimulationResult = simulate(
+        STRATEGIES[args.strategy],
+        args.hands,
+        args.wager,
+        num_decks=args.decks,
+        seed=args.seed,
+        wager_policy=bet_ramp(args.wager, args.spread) if args.spread > 1 else None,
+        system=args.system,
+    )
+
+    print(f"Strategy:        {args.strategy}")
+    if args.spread > 1:
+        print(f"Bet spread:      1-{args.spread} on the {args.system} true count")
+    print(f"Hands played:    {result.hands:,}")
+    print(f"Expected value:  {result.expected_value:+.4f} per $1 wagered")
+    print(f"Variance:        {result.variance:.4f} per hand, in units of its wager")
+    if args.spread > 1:
+        print(f"Average wager:   ${result.wagered / result.hands:,.2f}")
+    if result.ruin_hand is None:
+        print(
+            f"Bankroll:        ${MONEY:,} never ran out (lowest ${result.lowest_money:,})"
+        )
+    else:
+        print(f"Bankroll:        ${MONEY:,} ran out on hand #{result.ruin_hand:,}")
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options for the simulation.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Headless blackjack simulation.")
+    parser.add_argument(
+        "--strategy",
+        choices=sorted(STRATEGIES),
+        default="dealer",
+        help="Player strategy.",
+    )
+    parser.add_argument(
+        "--hands", type=int, default=100_000, help="Number of hands to play."
+    )
+    parser.add_argument("--wager", type=int, default=100, help="Wager of each hand.")
+    parser.add_argument(
+        "--decks", type=int, default=6, help="Number of decks in the shoe (1-8)."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed for reproducible runs."
+    )
+    parser.add_argument(
+        "--system",
+        choices=sorted(TAG_TABLES),
+        default="hi-lo",
+        help="Card counting system.",
+    )
+    parser.add_argument(
+        "--spread",
+        type=int,
+        default=1,
+        help="Largest wager, in units of --wager, raised with the true count.",
+    )
+    parser.add_argument(
+        "--curve",
+        action="store_true",
+        help="Show the expected value at each true count.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes for --curve."
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.hands < 1:
+        parser.error("--hands must be at least 1")
+    if args.wager < 1:
+        parser.error("--wager must be at least 1")
+    if args.decks not in range(1, 9):
+        parser.error("--decks must be between 1 and 8")
+    if args.spread < 1:
+        parser.error("--spread must be at least 1")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    return args
+
+
+def simulate(
+    strategy: Strategy,
+    num_hands: int,
+    wager: int = 100,
+    money: int = MONEY,
+    num_decks: int = 6,
+    penetration: float = PENETRATION,
+    seed: int | None = None,
+    wager_policy: WagerPolicy | None = None,
+    system: str = "hi-lo",
+    num_tables: int = TABLES,
+) -> SimulationResult:
+    """
+    Plays a number of hands with a strategy and summarizes the results.
+
+    The hands are played by `blackjack_batch.BatchTables`, a hand at each of
+    `num_tables` tables (each with its own shoe) at a time, and the bankroll
+    follows them one table after another, as if one player moved between the
+    tables. The strategy is asked about every situation once, up front.
+
+    :param strategy: The player's strategy.
+    :type strategy: Strategy
+    :param num_hands: Number of hands to play.
+    :type num_hands: int
+    :param wager: Wager of each hand (doubled on a double down), defaults to 100
+    :type wager: int, optional
+    :param money: Starting bankroll, defaults to MONEY
+    :type money: int, optional
+    :param num_decks: Number of decks in the shoe, defaults to 6
+    :type num_decks: int, optional
+    :param penetration: Share of the shoe dealt before reshuffling, defaults to PENETRATION
+    :type penetration: float, optional
+    :param seed: Seed for reproducible runs, defaults to None
+    :type seed: int | None, optional
+    :param wager_policy: Chooses the wager of each hand from the true count,
+        defaults to a flat wager
+    :type wager_policy: WagerPolicy | None, optional
+    :param system: Card counting system of the wager policy, defaults to "hi-lo"
+    :type system: str, optional
+    :param num_tables: Tables played side by side, defaults to TABLES
+    :type num_tables: int, optional
+    :return: Summary of the hands played.
+    :rtype: SimulationResult
+    """
+    policy: Policy = strategy_policy(strategy)
+    num_tables = min(num_tables, num_hands)
+    tables = BatchTables(
+        num_tables,
+        num_decks,
+        penetration,
+        money=TABLE_MONEY,
+        seed=seed,
+        system=None if wager_policy is None else system,
+    )
+
+    wagered: int = 0
+    net: int = 0
+    net_squared: int = 0
+    unit_net: float = 0.0
+    unit_squared: float = 0.0
+    ruin_hand: int | None = None
+    lowest_money: int = money
+
+    for first_hand in range(0, num_hands, num_tables):
+        if wager_policy is None:
+            bets: np.ndarray = np.full(num_tables, wager, dtype=np.int64)
+        else:  # Ask the policy once for each true count at the tables
+            true_counts, inverse = np.unique(tables.true_counts(), return_inverse=True)
+            bets = np.array(
+                [wager_policy(int(true_count)) for true_count in true_counts],
+                dtype=np.int64,
+            )[inverse]
+        results: np.ndarray = tables.play_hand(bets, policy)
+
+        # Tables past the last hand played this step are left out.
+        played: int = min(num_tables, num_hands - first_hand)
+        bets, results = bets[:played], results[:played]
+        units: np.ndarray = results / bets
+
+        if ruin_hand is None:
+            bankroll: np.ndarray = money + net + np.cumsum(results)
+            broke: np.ndarray = np.flatnonzero(bankroll <= 0)
+            if len(broke):
+                ruin_hand = first_hand + int(broke[0]) + 1
+                bankroll = bankroll[: broke[0] + 1]
+            lowest_money = min(lowest_money, int(bankroll.min()))
+
+        wagered += int(bets.sum())
+        net += int(results.sum())
+        net_squared += int((results * results).sum())
+        unit_net += float(units.sum())
+        unit_squared += float((units * units).sum())
+
+    return SimulationResult(
+        num_hands,
+        wager,
+        wagered,
+        net,
+        net_squared,
+        unit_net,
+        unit_squared,
+        ruin_hand,
+        lowest_money,
+    )
+
+
+def play_hand(strategy: Strategy, wager: int, shoe: Shoe) -> tuple[str, int]:
+    """
+    Deals and plays out a single hand following the rules of `blackjack.main`.
+
+    :param strategy: The player's strategy.
+    :type strategy: Strategy
+    :param wager: Wager of the hand.
+    :type wager: int
+    :param shoe: The shoe the cards are dealt from.
+    :type shoe: Shoe
+    :return: Player result ('win', 'lose', 'tie') and the final wager.
+    :rtype: tuple[str, int]
+    """
+    draw = shoe.draw
+
+    player: tuple[int, int] = add_card(add_card((0, 0), draw()), draw())
+    hidden_card: int = draw()
+    up_card: int = draw()
+    dealer: tuple[int, int] = add_card(add_card((0, 0), hidden_card), up_card)
+
+    player_move: str = ""
+    first_move: bool = True
+    while player_move not in ["S", "D"]:
+        player_move = strategy(
+            hand_value(player), is_soft(player), CARD_VALUES[up_card], first_move
+        )
+        if player_move == "D" and not first_move:
+            player_move = "H"  # Can only double down on the first move
+        first_move = False
+
+        if player_move in ["H", "D"]:
+            player = add_card(player, draw())
+            if player_move == "D":
+                wager *= 2
+
+        if hand_value(player) > 21:  # Player busts
+            return "lose", wager
+
+    while hand_value(dealer) < 17:
+        dealer = add_card(dealer, draw())
+
+    return compare_values(hand_value(player), hand_value(dealer)), wager
+
+
+def table_strategy(
+    table: dict[tuple[int, bool, int], str], default: str = "S"
+) -> Strategy:
+    """
+    Turns a lookup table into a strategy.
+
+    :param table: Moves keyed by (player total, soft hand, dealer card value).
+        The dealer card value is 1 for an ace.
+    :type table: dict[tuple[int, bool, int], str]
+    :param default: Move for situations missing from the table, defaults to "S"
+    :type default: str, optional
+    :return: The strategy.
+    :rtype: Strategy
+    """
+
+    def strategy(total: int, soft: bool, dealer_value: int, can_double: bool) -> str:
+        return table.get((total, soft, dealer_value), default)
+
+    return strategy
+
+
+def dealer_strategy(total: int, soft: bool, dealer_value: int, can_double: bool) -> str:
+    """Plays like the dealer: hits below 17."""
+    return "H" if total < 17 else "S"
+
+
+def never_bust_strategy(
+    total: int, soft: bool, dealer_value: int, can_double: bool
+) -> str:
+    """Only hits when no card can bust the hand."""
+    return "H" if total < 12 or soft else "S"
+
+
+def basic_strategy(total: int, soft: bool, dealer_value: int, can_double: bool) -> str:
+    """Plays the basic strategy generated by blackjack_strategy for a 6 deck shoe."""
+    return lookup(basic_table(6), total, soft, dealer_value, can_double)
+
+
+STRATEGIES: dict[str, Strategy] = {
+    "basic": basic_strategy,
+    "dealer": dealer_strategy,
+    "never-bust": never_bust_strategy,
+}
+
+
+def count_curve(
+    strategy_name: str,
+    num_hands: int,
+    num_decks: int = 6,
+    penetration: float = PENETRATION,
+    system: str = "hi-lo",
+    seed: int | None = None,
+    workers: int = 1,
+) -> dict[int, list[int]]:
+    """
+    Plays flat wagers and totals the results by the true count before each hand.
+
+    :param strategy_name: Name of the player's strategy in STRATEGIES.
+    :type strategy_name: str
+    :param num_hands: Number of hands to play.
+    :type num_hands: int
+    :param num_decks: Number of decks in the shoe, defaults to 6
+    :type num_decks: int, optional
+    :param penetration: Share of the shoe dealt before reshuffling, defaults to PENETRATION
+    :type penetration: float, optional
+    :param system: Card counting system, defaults to "hi-lo"
+    :type system: str, optional
+    :param seed: Seed for reproducible runs, defaults to None
+    :type seed: int | None, optional
+    :param workers: Number of worker processes, defaults to 1
+    :type workers: int, optional
+    :return: Hands, net units won and sum of squared results by true count
+        (limited to +/- MAX_TRUE_COUNT).
+    :rtype: dict[int, list[int]]
+    """
+    tasks: list[tuple] = [
+        (
+            strategy_name,
+            min(SHARD_HANDS, num_hands - start),
+            num_decks,
+            penetration,
+            system,
+            None if seed is None else f"{seed}:{shard}",
+        )
+        for shard, start in enumerate(range(0, num_hands, SHARD_HANDS))
+    ]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            shards: list[dict] = list(pool.map(_count_shard, tasks))
+    else:
+        shards = list(map(_count_shard, tasks))
+
+    curve: dict[int, list[int]] = {}
+    for shard_curve in shards:
+        for true_count, tally in shard_curve.items():
+            totals: list[int] = curve.setdefault(true_count, [0, 0, 0])
+            for index, value in enumerate(tally):
+                totals[index] += value
+
+    return dict(sorted(curve.items()))
+
+
+def _count_shard(task: tuple) -> dict[int, list[int]]:
+    """
+    Plays one shard of `count_curve`. Executed in the worker processes.
+
+    :param task: Strategy name, hands, decks, penetration, system and seed.
+    :type task: tuple
+    :return: Hands, net units won and sum of squared results by true count.
+    :rtype: dict[int, list[int]]
+    """
+    strategy_name, num_hands, num_decks, penetration, system, seed = task
+    strategy: Strategy = STRATEGIES[strategy_name]
+    shoe: Shoe = Shoe(num_decks, penetration, random.Random(seed))
+    counter: CardCounter = CardCounter(shoe, system)
+
+    curve: dict[int, list[int]] = {}
+    for hand_num in range(num_hands):
+        shoe.start_hand()
+        true_count: int = max(-MAX_TRUE_COUNT, min(MAX_TRUE_COUNT, counter.true_count))
+        outcome, stake = play_hand(strategy, 1, shoe)
+        result: int = payout(outcome, 0, stake)
+
+        tally: list[int] = curve.setdefault(true_count, [0, 0, 0])
+        tally[0] += 1
+        tally[1] += result
+        tally[2] += result * result
+
+    return curve
+
+
+def display_curve(curve: dict[int, list[int]]) -> None:
+    """
+    Displays the expected value at each true count.
+
+    :param curve: Results by true count, from `count_curve`.
+    :type curve: dict[int, list[int]]
+    """
+    total_hands: int = sum(tally[0] for tally in curve.values())
+
+    print("True count     Hands   Share  Expected value")
+    for true_count, (hands, net, net_squared) in curve.items():
+        mean: float = net / hands
+        error: float = ((net_squared / hands - mean**2) / hands) ** 0.5
+        label: str = f"{true_count:+d}"
+        if abs(true_count) == MAX_TRUE_COUNT:  # Includes counts beyond it
+            label = ("<= " if true_count < 0 else ">= ") + label
+        print(
+            f"{label:>10} {hands:>9,} {hands / total_hands:>7.2%}"
+            f"  {mean:+.4f} +/- {error:.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
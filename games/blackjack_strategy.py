@@ -0,0 +1,254 @@
+"""blackjack_strategy.py -- John Michael Jarvis JMJarvis1@icloud.com
+
+Generates the basic strategy for the rules of blackjack.py: no splitting,
+surrendering or insurance, and doubling down only as the first move (taking
+exactly one more card). For every player total, soft or hard, against every
+dealer face-up card, the expected value of standing, hitting and doubling
+down is calculated exactly from the dealer outcome probabilities of
+blackjack_dealer.py, and the best move is kept.
+
+The result is a compact binary table: a short header followed by one byte
+per (soft, total, dealer card) cell. The low 4 bits of a cell hold the best
+move while doubling down is allowed, and the high 4 bits the best move once
+it is not, so `lookup` answers with a single index.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from blackjack import NUM_DECKS, hand_value, is_soft
+from blackjack_dealer import dealer_distribution, remove_cards, shoe_counts
+
+MOVES: str = "HSD"  # Move of each code stored in the table
+TABLE_MAGIC: bytes = b"BJST"
+TABLE_VERSION: int = 1
+HEADER_SIZE: int = len(TABLE_MAGIC) + 2  # Magic, version and number of decks
+NUM_TOTALS: int = 22  # Player totals 0-21
+NUM_UP_CARDS: int = 10  # Dealer card values 1 (ace) to 10
+
+_tables: dict[int, bytes] = {}  # Generated tables by number of decks
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    table: bytes = generate_table(args.decks, workers=args.workers)
+    if args.output is not None:
+        with open(file=args.output, mode="wb") as write_file:
+            write_file.write(table)
+
+    display_table(table)
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Blackjack basic strategy generator.")
+    parser.add_argument(
+        "--decks", type=int, default=NUM_DECKS, help="Number of decks in the shoe."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--output", default=None, help="File to save the binary table to."
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.decks not in range(1, 9):
+        parser.error("--decks must be between 1 and 8")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    return args
+
+
+def generate_table(num_decks: int = NUM_DECKS, workers: int = 1) -> bytes:
+    """
+    Generates the basic strategy table, one dealer card per task.
+
+    :param num_decks: Number of decks in the shoe, defaults to NUM_DECKS
+    :type num_decks: int, optional
+    :param workers: Number of worker processes, defaults to 1
+    :type workers: int, optional
+    :return: The binary strategy table.
+    :rtype: bytes
+    """
+    tasks: list[tuple[int, int]] = [
+        (num_decks, up_value) for up_value in range(1, NUM_UP_CARDS + 1)
+    ]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            columns: list[bytes] = list(pool.map(_generate_column, tasks))
+    else:
+        columns = list(map(_generate_column, tasks))
+
+    # Cells are stored by soft flag, then total, then dealer card.
+    cells: bytes = bytes(
+        columns[up_index][row]
+        for row in range(2 * NUM_TOTALS)
+        for up_index in range(NUM_UP_CARDS)
+    )
+
+    return TABLE_MAGIC + bytes([TABLE_VERSION, num_decks]) + cells
+
+
+def _generate_column(task: tuple[int, int]) -> bytes:
+    """
+    Finds the best moves against one dealer card. Executed in the worker processes.
+
+    :param task: Number of decks and dealer card value.
+    :type task: tuple[int, int]
+    :return: One cell per (soft, total), soft flag first.
+    :rtype: bytes
+    """
+    num_decks, up_value = task
+    counts: tuple[int, ...] = remove_cards(shoe_counts(num_decks), [up_value])
+    dealer: tuple[float, ...] = dealer_distribution(up_value, counts)
+    cards_left: int = sum(counts)
+    draws: list[tuple[int, float]] = [
+        (card_value, count / cards_left)
+        for card_value, count in enumerate(counts, start=1)
+        if count
+    ]
+
+    # Expected value of standing on each total (0-21).
+    bust_chance: float = dealer[-1]
+    stand: list[float] = [
+        bust_chance
+        + sum(dealer[: max(0, total - 17)])
+        - sum(dealer[max(0, total - 16) : -1])
+        for total in range(NUM_TOTALS)
+    ]
+
+    # Expected value of the best move (without doubling) from each hand
+    # state, working down from the highest hard total.
+    best: dict[tuple[int, bool], float] = {}
+    hit: dict[tuple[int, bool], float] = {}
+    double: dict[tuple[int, bool], float] = {}
+    for hard in range(21, 1, -1):
+        for has_ace in (True, False):
+            state = (hard, has_ace)
+            hit_ev: float = 0.0
+            double_ev: float = 0.0
+            for card_value, chance in draws:
+                next_state = (hard + card_value, has_ace or card_value == 1)
+                next_value: int = hand_value(next_state)
+                if next_value > 21:  # Bust
+                    hit_ev -= chance
+                    double_ev -= 2 * chance
+                else:
+                    hit_ev += chance * best[next_state]
+                    double_ev += 2 * chance * stand[next_value]
+
+            hit[state] = hit_ev
+            double[state] = double_ev
+            best[state] = max(stand[hand_value(state)], hit_ev)
+
+    cells: bytearray = bytearray(2 * NUM_TOTALS)
+    for state in hit:
+        total: int = hand_value(state)
+        row: int = is_soft(state) * NUM_TOTALS + total
+        options: list[float] = [hit[state], stand[total]]  # In the order of MOVES
+        no_double: int = options.index(max(options))
+        options.append(double[state])
+        with_double: int = options.index(max(options))
+        cells[row] = with_double | no_double << 4
+
+    return bytes(cells)
+
+
+def load_table(path: str) -> bytes:
+    """
+    Loads a binary table saved by `main`.
+
+    :param path: Path to the table file.
+    :type path: str
+    :raises ValueError: Raised if the file is not a strategy table.
+    :return: The binary strategy table.
+    :rtype: bytes
+    """
+    with open(file=path, mode="rb") as read_file:
+        table: bytes = read_file.read()
+
+    expected_size: int = HEADER_SIZE + 2 * NUM_TOTALS * NUM_UP_CARDS
+    if (
+        not table.startswith(TABLE_MAGIC)
+        or table[len(TABLE_MAGIC)] != TABLE_VERSION
+        or len(table) != expected_size
+    ):
+        raise ValueError("An error occurred", "ValueError", f"path = {path}")
+
+    return table
+
+
+def basic_table(num_decks: int = NUM_DECKS) -> bytes:
+    """
+    Returns the basic strategy table, generating it on first use.
+
+    :param num_decks: Number of decks in the shoe, defaults to NUM_DECKS
+    :type num_decks: int, optional
+    :return: The binary strategy table.
+    :rtype: bytes
+    """
+    if num_decks not in _tables:
+        _tables[num_decks] = generate_table(num_decks)
+
+    return _tables[num_decks]
+
+
+def lookup(
+    table: bytes, total: int, soft: bool, dealer_value: int, can_double: bool
+) -> str:
+    """
+    Looks up the best move in a strategy table.
+
+    :param table: The binary strategy table.
+    :type table: bytes
+    :param total: Value of the player's hand.
+    :type total: int
+    :param soft: True if the player's hand is soft.
+    :type soft: bool
+    :param dealer_value: Value of the dealer's face-up card (1 for an ace).
+    :type dealer_value: int
+    :param can_double: True if the player may still double down.
+    :type can_double: bool
+    :return: The best move: "H" (hit), "S" (stand) or "D" (double down).
+    :rtype: str
+    """
+    cell: int = table[
+        HEADER_SIZE + (soft * NUM_TOTALS + total) * NUM_UP_CARDS + dealer_value - 1
+    ]
+
+    return MOVES[cell & 0xF if can_double else cell >> 4]
+
+
+def display_table(table: bytes) -> None:
+    """
+    Displays a strategy table as the usual hard and soft totals charts.
+
+    :param table: The binary strategy table.
+    :type table: bytes
+    """
+    up_values: list[int] = [2, 3, 4, 5, 6, 7, 8, 9, 10, 1]  # Ace last
+    header: str = "       " + " ".join(
+        f"{'A' if up_value == 1 else up_value:>2}" for up_value in up_values
+    )
+
+    for soft, totals in ((False, range(5, 22)), (True, range(13, 22))):
+        print("Soft totals:" if soft else "Hard totals:")
+        print(header)
+        for total in totals:
+            moves: list[str] = [
+                lookup(table, total, soft, up_value, True) for up_value in up_values
+            ]
+            print(f"{total:>6} " + " ".join(f"{move:>2}" for move in moves))
+        print()
+
+
+if __name__ == "__main__":
+    main()
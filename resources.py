@@ -0,0 +1,137 @@
+"""
+resources.py, by John Michael Jarvis JMJarvis1@icloud.com
+Loads the text files shared by the programs, such as games/text.json.
+
+Paths are resolved relative to this repository rather than the working
+directory. Each file is parsed once and kept in an in-process cache until its
+modification time changes, and text can be compiled once into its wrapped and
+justified form for a given width. A missing or unreadable file is logged and
+treated as empty instead of stopping the program.
+"""
+
+import json
+import logging
+import os
+from typing import Literal
+
+from common_functions import format_message
+
+ROOT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+TEXT_FILE: str = "text.json"
+
+_files: dict[str, tuple[int, object]] = {}  # Parsed files by path, with their mtime
+_compiled: dict[tuple, tuple[int, str]] = {}  # Compiled text by path and layout
+
+
+def resource_path(name: str, package: str = "games") -> str:
+    """
+    Returns the path of a resource file.
+
+    :param name: Name of the file, i.e. 'text.json'.
+    :type name: str
+    :param package: Directory of the file within the repository, defaults to "games"
+    :type package: str, optional
+    :return: The absolute path of the file.
+    :rtype: str
+    """
+    return os.path.join(ROOT_DIR, package, name)
+
+
+def load_json(path: str) -> object | None:
+    """
+    Loads a json file, parsing it again only if it has changed since the last load.
+
+    :param path: Path to the file.
+    :type path: str
+    :return: The contents of the file, or None if it could not be loaded.
+    :rtype: object | None
+    """
+    mtime: int | None = _modified(path)
+    if mtime is None:
+        return None
+
+    cached: tuple[int, object] | None = _files.get(path)
+    if cached is None or cached[0] != mtime:
+        try:
+            with open(file=path, mode="r", encoding="UTF-8") as read_file:
+                contents: object = json.load(read_file)
+        except (OSError, ValueError):
+            logging.error(f" An error occurred when attempting to load '{path}'.")
+            return None
+        cached = _files[path] = (mtime, contents)
+
+    return cached[1]
+
+
+def load_text(key: str, name: str = TEXT_FILE, package: str = "games") -> dict:
+    """
+    Loads the text of one program from a shared text file.
+
+    :param key: The name of the program, i.e. 'blackjack.py'.
+    :type key: str
+    :param name: Name of the text file, defaults to TEXT_FILE
+    :type name: str, optional
+    :param package: Directory of the file within the repository, defaults to "games"
+    :type package: str, optional
+    :return: The program's text by section, or an empty dict if there is none.
+    :rtype: dict
+    """
+    contents: object = load_json(resource_path(name, package))
+    if not isinstance(contents, dict) or not isinstance(contents.get(key), dict):
+        return {}
+
+    return contents[key]
+
+
+def compile_text(
+    key: str,
+    section: str,
+    txt_width: int = 80,
+    msg_just: Literal["ljust", "rjust", "center"] = "ljust",
+    name: str = TEXT_FILE,
+    package: str = "games",
+) -> str:
+    """
+    Returns a section of a program's text wrapped and justified to a width, as
+    `common_functions.display_message` would show it. The result is cached
+    until the text file changes.
+
+    :param key: The name of the program, i.e. 'blackjack.py'.
+    :type key: str
+    :param section: The section of the text, i.e. 'rules'.
+    :type section: str
+    :param txt_width: Width of the text, defaults to 80
+    :type txt_width: int, optional
+    :param msg_just: Justification of the lines, defaults to "ljust"
+    :type msg_just: Literal["ljust", "rjust", "center"], optional
+    :param name: Name of the text file, defaults to TEXT_FILE
+    :type name: str, optional
+    :param package: Directory of the file within the repository, defaults to "games"
+    :type package: str, optional
+    :return: The lines of text joined by newlines, or "" if there is no such text.
+    :rtype: str
+    """
+    path: str = resource_path(name, package)
+    mtime: int | None = _modified(path)
+    if mtime is None:
+        return ""
+
+    cache_key: tuple = (path, key, section, txt_width, msg_just)
+    cached: tuple[int, str] | None = _compiled.get(cache_key)
+    if cached is None or cached[0] != mtime:
+        message: list[str] | str = load_text(key, name, package).get(section, [])
+        text: str = "\n".join(format_message(message, txt_width, msg_just))
+        cached = _compiled[cache_key] = (mtime, text)
+
+    return cached[1]
+
+
+def _modified(path: str) -> int | None:
+    """
+    Returns the modification time of a file in nanoseconds, or None if it is missing.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        logging.error(f" An error occurred when attempting to load '{path}'.")
+        return None
@@ -4,21 +4,58 @@ A simulation that allows the user to determine then pobability that any two
 people in a group of N number of people share the ssame birthday.
 """
 
+import argparse
+import json
 import random
+from array import array
 import datetime as dt
 import os
 import sys
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 sys.path.append(os.getcwd() + "/..")
 
 from common_functions import clear_scrn, display_message, month_end_date
 
+# Calendar tables used by the array engine. Days are numbered 0-364 from Jan 1.
+MONTH_LENGTHS: np.ndarray = np.array([month_end_date(m) for m in range(1, 13)])
+MONTH_STARTS: np.ndarray = np.concatenate(([0], np.cumsum(MONTH_LENGTHS)[:-1]))
+DAY_PROBABILITIES: np.ndarray = np.repeat(1 / (12 * MONTH_LENGTHS), MONTH_LENGTHS)
+SIM_BATCH_SIZE: int = 50_000  # Trials drawn per array batch
+ADAPTIVE_BATCH_SIZE: int = 1_000  # Trials drawn between confidence checks
+CONFIDENCE_Z: float = 1.96  # z-score of a 95% confidence interval
+CHECKPOINT_EVERY: int = 10  # Batches between checkpoint writes
+
 
 def main() -> None:
+    args: argparse.Namespace = parse_args()
+
     # Settings
     rng_grp_size: range = range(2, 101)  # Number of people in group (2-100)
     txt_width = 80  # Maximum width in chracters of displayed text.
-    num_sims = 100_000  # Number of simulations to run
+    num_sims = args.sims  # Number of simulations to run
+
+    if args.exact:  # Non-interactive exact probability curve
+        display_sweep(exact_probabilities(rng_grp_size))
+        sys.exit()
+    elif args.sweep:  # Non-interactive estimated probability curve
+        display_sweep(
+            sweep(rng_grp_size, num_sims, seed=args.seed, workers=args.workers)
+        )
+        sys.exit()
+    elif args.group_size is not None:  # Non-interactive (resumable) run
+        sim_matches: int = run_simulations(
+            num_sims,
+            args.group_size,
+            seed=args.seed,
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+        )
+        print(f"{sim_matches:,} of {num_sims:,} simulations had a match.")
+        sys.exit()
 
     while True:  # Main loop
         intro_msg: list[str] = [
@@ -38,29 +75,41 @@ def main() -> None:
         grp_size: int = get_group_size(rng_grp_size, txt_width, input_msg)
 
         # Generate and display the birthdays
-        birthdays: list[str] = generate_birthdays(grp_size)
+        birthdays: array = generate_birthdays(grp_size)
         display_birthdays(birthdays)
 
         # Determine if two birthdays match
-        match: str | None = get_match(birthdays)
+        match: int | None = get_match(birthdays)
         match_msg: str = ""
         if match is not None:
-            match_msg += f"There is at least one pair of people in this simulation sharing a birthday on {match}.\n"
+            match_msg += f"There is at least one pair of people in this simulation sharing a birthday on {format_birthday(match)}.\n"
         else:
             match_msg += "There were no matches in this simulation.\n"
 
         display_message(match_msg, txt_width)
 
-        # Run through 100_000 simulations
-        sim_message = f"\nNow the program will run {num_sims:,} simulations on a group of {grp_size} people:\n"
-        display_message(sim_message)
+        # Run through the simulations
+        if args.ci_width is None:
+            sim_message = f"\nNow the program will run {num_sims:,} simulations on a group of {grp_size} people:\n"
+            display_message(sim_message)
 
-        sim_matches: int = run_simulations(num_sims, grp_size)
+            sims_run: int = num_sims
+            sim_matches = run_simulations(
+                num_sims, grp_size, seed=args.seed, workers=args.workers
+            )
+        else:
+            sim_message = f"\nNow the program will run simulations on a group of {grp_size} people until the 95% confidence interval is narrower than {args.ci_width:.2%}:\n"
+            display_message(sim_message)
 
-        sim_ratio = sim_matches * 100 / num_sims
+            sim_matches, sims_run = run_adaptive_simulations(
+                grp_size, args.ci_width, max_sims=num_sims, seed=args.seed
+            )
+
+        sim_ratio = sim_matches * 100 / sims_run
+        exact_ratio = exact_probabilities(range(grp_size, grp_size + 1))[grp_size] * 100
 
         # Display simulation results
-        sim_results_msg = f"Out of {num_sims:,} simulations of {grp_size} people run, {sim_matches:,} simulations resulted in at least two person sharing the same birthday. That is a ratio of {round(sim_ratio, 1) if sim_ratio > 1 else round(sim_ratio, 2)}%!\n"
+        sim_results_msg = f"Out of {sims_run:,} simulations of {grp_size} people run, {sim_matches:,} simulations resulted in at least two person sharing the same birthday. That is a ratio of {round(sim_ratio, 1) if sim_ratio > 1 else round(sim_ratio, 2)}%! The exact probability is {round(exact_ratio, 1) if exact_ratio > 1 else round(exact_ratio, 2)}%.\n"
         display_message(sim_results_msg)
 
         if (
@@ -73,34 +122,497 @@ def main() -> None:
     sys.exit()
 
 
-def run_simulations(num_sims: int, grp_size: int) -> int:
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options for the simulation.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="The Birthday Paradox simulation.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes to run the simulations on.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Master seed for reproducible runs."
+    )
+    parser.add_argument(
+        "--sims",
+        type=int,
+        default=100_000,
+        help="Number of simulations to run (the limit when using --ci-width).",
+    )
+    parser.add_argument(
+        "--ci-width",
+        type=float,
+        default=None,
+        help="Stop simulating once the 95%% confidence interval is this narrow.",
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Print the exact match probability of every group size and exit.",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Print the match probability of every group size and exit.",
+    )
+    parser.add_argument(
+        "--group-size",
+        type=int,
+        default=None,
+        help="Simulate this group size without prompting and exit.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Checkpoint file used to save and resume a --group-size run.",
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.sims < 1:
+        parser.error("--sims must be at least 1")
+    if args.ci_width is not None and not 0 < args.ci_width < 1:
+        parser.error("--ci-width must be between 0 and 1")
+    if args.group_size is not None and args.group_size < 1:
+        parser.error("--group-size must be at least 1")
+    if args.checkpoint is not None and args.group_size is None:
+        parser.error("--checkpoint requires --group-size")
+
+    return args
+
+
+def run_simulations(
+    num_sims: int,
+    grp_size: int,
+    seed: int | None = None,
+    workers: int = 1,
+    checkpoint_path: str | None = None,
+) -> int:
     """
     Runs multiple iterations of the birthday paradox simulation.
 
+    Trials are split into batches of `SIM_BATCH_SIZE`. Each batch is drawn as a
+    day-of-year matrix (one row per trial) with its own random stream derived
+    from the master seed, so a seeded run gives the same result for any number
+    of workers.
+
     :param num_sims: The number of iterations to run.
     :type num_sims: int
     :param grp_size: Group size to generate birthdays for.
     :type grp_size: int
+    :param seed: Master seed for the random streams, defaults to None
+    :type seed: int | None, optional
+    :param workers: Number of worker processes, defaults to 1
+    :type workers: int, optional
+    :param checkpoint_path: File to save progress to and resume from, defaults to None
+    :type checkpoint_path: str | None, optional
     :return sim_matches: Number of total matches from all simulations
     :rtype: int
     """
     # Initialize count of sims with matching birthdays.
     sim_matches: int = 0
-    for sim_count in range(num_sims):
-        birthdays = generate_birthdays(grp_size)
-        match = get_match(birthdays)
+    for sim_count, sim_matches in stream_simulations(
+        num_sims, grp_size, seed, workers, checkpoint_path
+    ):
+        print(f"{sim_count:,} simulations run...")
 
-        if match is not None:
-            sim_matches += 1
+    print("\nAll simulations successfully run.\n")
+    return sim_matches
 
-        sim_count += 1
 
-        if sim_count % 10_000 == 0:
-            print(f"{sim_count:,} simulations run...")
+def stream_simulations(
+    num_sims: int,
+    grp_size: int,
+    seed: int | None = None,
+    workers: int = 1,
+    checkpoint_path: str | None = None,
+    checkpoint_every: int = CHECKPOINT_EVERY,
+) -> Iterator[tuple[int, int]]:
+    """
+    Runs the simulations batch by batch, yielding the running tally after each.
+
+    When `checkpoint_path` is given the tally, master seed and next batch are
+    saved every `checkpoint_every` batches. As each batch's random stream is
+    derived from the master seed and batch number, that is all that is needed
+    to pick up a stopped run where its last checkpoint left off.
+
+    :param num_sims: The number of iterations to run.
+    :type num_sims: int
+    :param grp_size: Group size to generate birthdays for.
+    :type grp_size: int
+    :param seed: Master seed for the random streams, defaults to None
+    :type seed: int | None, optional
+    :param workers: Number of worker processes, defaults to 1
+    :type workers: int, optional
+    :param checkpoint_path: File to save progress to and resume from, defaults to None
+    :type checkpoint_path: str | None, optional
+    :param checkpoint_every: Batches between checkpoints, defaults to CHECKPOINT_EVERY
+    :type checkpoint_every: int, optional
+    :raises ValueError: Raised if the checkpoint belongs to a different run.
+    :return: Yields the number of simulations run and matches found so far.
+    :rtype: Iterator[tuple[int, int]]
+    """
+    state: dict = {
+        "num_sims": num_sims,
+        "grp_size": grp_size,
+        "batch_size": SIM_BATCH_SIZE,
+        "entropy": np.random.SeedSequence(seed).entropy,
+        "next_batch": 0,
+        "sim_count": 0,
+        "sim_matches": 0,
+    }
+
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        saved: dict = load_checkpoint(checkpoint_path)
+        for key in ("num_sims", "grp_size", "batch_size"):
+            if saved[key] != state[key]:
+                raise ValueError(
+                    "Checkpoint belongs to a different run", key, saved[key]
+                )
+        if seed is not None and saved["entropy"] != seed:
+            raise ValueError("Checkpoint belongs to a different run", "seed", seed)
+        state = saved
+
+        if state["sim_count"] == num_sims:  # Run had already finished
+            yield state["sim_count"], state["sim_matches"]
+            return
+
+    for batches_run, (batch_size, batch_matches) in enumerate(
+        _map_batches(
+            _run_batch,
+            num_sims,
+            grp_size,
+            state["entropy"],
+            workers,
+            first_batch=state["next_batch"],
+        ),
+        start=1,
+    ):
+        state["next_batch"] += 1
+        state["sim_count"] += batch_size
+        state["sim_matches"] += batch_matches
+
+        finished: bool = state["sim_count"] == num_sims
+        if checkpoint_path is not None and (
+            finished or batches_run % checkpoint_every == 0
+        ):
+            save_checkpoint(checkpoint_path, state)
+
+        yield state["sim_count"], state["sim_matches"]
+
+
+def save_checkpoint(path: str, state: dict) -> None:
+    """
+    Saves the state of a simulation run. The file is replaced in one step so a
+    run killed mid-write leaves the previous checkpoint intact.
+
+    :param path: Path to the checkpoint file.
+    :type path: str
+    :param state: Run settings, master seed, next batch and running tally.
+    :type state: dict
+    """
+    temp_path: str = path + ".tmp"
+    with open(file=temp_path, mode="w", encoding="UTF-8") as write_file:
+        json.dump(state, write_file)
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path: str) -> dict:
+    """
+    Loads the state of a simulation run saved by `save_checkpoint`.
+
+    :param path: Path to the checkpoint file.
+    :type path: str
+    :return: Run settings, master seed, next batch and running tally.
+    :rtype: dict
+    """
+    with open(file=path, mode="r", encoding="UTF-8") as read_file:
+        return json.load(read_file)
+
+
+def sweep(
+    rng_grp_size: range, num_sims: int, seed: int | None = None, workers: int = 1
+) -> dict[int, float]:
+    """
+    Estimates the probability of a shared birthday for every group size in a range.
+
+    Each simulation draws birthdays for the largest group once and records how
+    many people it took to reach the first shared birthday. A group of N people
+    has a match whenever that number is N or fewer, so one pass over the draws
+    settles every group size.
+
+    :param rng_grp_size: Group sizes to estimate.
+    :type rng_grp_size: range
+    :param num_sims: The number of iterations to run.
+    :type num_sims: int
+    :param seed: Master seed for the random streams, defaults to None
+    :type seed: int | None, optional
+    :param workers: Number of worker processes, defaults to 1
+    :type workers: int, optional
+    :return: Estimated probability of a match keyed by group size.
+    :rtype: dict[int, float]
+    """
+    max_size: int = max(rng_grp_size)
+    first_matches: np.ndarray = np.zeros(max_size + 2, dtype=np.int64)
+    entropy: int = np.random.SeedSequence(seed).entropy
+
+    for _, batch_counts in _map_batches(
+        _run_sweep_batch, num_sims, max_size, entropy, workers
+    ):
+        first_matches += batch_counts
+
+    # Simulations with their first match at or below each group size.
+    matches: np.ndarray = np.cumsum(first_matches)
+
+    return {size: float(matches[size]) / num_sims for size in rng_grp_size}
+
+
+def run_adaptive_simulations(
+    grp_size: int, ci_width: float, max_sims: int = 100_000, seed: int | None = None
+) -> tuple[int, int]:
+    """
+    Runs simulations in batches of `ADAPTIVE_BATCH_SIZE` until the 95% (Wilson)
+    confidence interval of the match probability is narrower than `ci_width`.
+
+    :param grp_size: Group size to generate birthdays for.
+    :type grp_size: int
+    :param ci_width: Target width of the confidence interval (0-1).
+    :type ci_width: float
+    :param max_sims: Upper limit on simulations to run, defaults to 100_000
+    :type max_sims: int, optional
+    :param seed: Master seed for the random streams, defaults to None
+    :type seed: int | None, optional
+    :return: Number of matches and number of simulations run.
+    :rtype: tuple[int, int]
+    """
+    entropy: int = np.random.SeedSequence(seed).entropy
+    sim_matches: int = 0
+    sim_count: int = 0
+
+    for index, start in enumerate(range(0, max_sims, ADAPTIVE_BATCH_SIZE)):
+        batch_size: int = min(ADAPTIVE_BATCH_SIZE, max_sims - start)
+        sim_matches += _run_batch((entropy, index, batch_size, grp_size))
+        sim_count += batch_size
+
+        if confidence_width(sim_matches, sim_count) <= ci_width:
+            break
+
+    print(f"{sim_count:,} simulations run.\n")
+    return sim_matches, sim_count
+
+
+def confidence_width(matches: int, num_sims: int, z: float = CONFIDENCE_Z) -> float:
+    """
+    Returns the width of the Wilson score interval for a match ratio.
+
+    :param matches: Number of simulations with a match.
+    :type matches: int
+    :param num_sims: Number of simulations run.
+    :type num_sims: int
+    :param z: z-score of the confidence level, defaults to CONFIDENCE_Z
+    :type z: float, optional
+    :return: Width of the confidence interval.
+    :rtype: float
+    """
+    ratio: float = matches / num_sims
+    spread: float = ratio * (1 - ratio) / num_sims + z**2 / (4 * num_sims**2)
+
+    return 2 * z * spread**0.5 / (1 + z**2 / num_sims)
+
+
+def exact_probabilities(rng_grp_size: range) -> dict[int, float]:
+    """
+    Calculates the exact probability of a shared birthday for each group size.
+
+    Birthdays are not equally likely (a month is picked first, then a day), so
+    the chance of N distinct birthdays is N! times the sum over every set of N
+    days of the product of their probabilities. That sum is built up one day
+    at a time for all N at once, scaled by N! as it goes to stay in range.
+
+    :param rng_grp_size: Group sizes to calculate.
+    :type rng_grp_size: range
+    :return: Probability of a match keyed by group size.
+    :rtype: dict[int, float]
+    """
+    max_size: int = max(rng_grp_size)
+    sizes: np.ndarray = np.arange(1, max_size + 1)
+
+    # distinct[n] is the probability that n people all have different birthdays.
+    distinct: np.ndarray = np.zeros(max_size + 1)
+    distinct[0] = 1.0
+    for probability in DAY_PROBABILITIES:
+        distinct[1:] += sizes * probability * distinct[:-1]
+
+    return {size: float(1 - distinct[size]) for size in rng_grp_size}
+
+
+def display_sweep(probabilities: dict[int, float]) -> None:
+    """
+    Displays the estimated probability of a match for each group size.
+
+    :param probabilities: Probability of a match keyed by group size.
+    :type probabilities: dict[int, float]
+    """
+    print("Group size    Probability")
+    print("----------    -----------")
+    for size, probability in probabilities.items():
+        print(f"{size:>10}    {probability:>10.2%}")
+
+
+def _map_batches(
+    func,
+    num_sims: int,
+    grp_size: int,
+    entropy: int,
+    workers: int,
+    first_batch: int = 0,
+) -> Iterator:
+    """
+    Splits the simulations into batches and runs `func` on each of them, in the
+    current process or across a pool of `workers` processes.
+
+    :param func: Batch function taking a (entropy, index, size, grp_size) tuple.
+    :param num_sims: The number of iterations to run.
+    :type num_sims: int
+    :param grp_size: Group size to generate birthdays for.
+    :type grp_size: int
+    :param entropy: Master seed entropy for the random streams.
+    :type entropy: int
+    :param workers: Number of worker processes.
+    :type workers: int
+    :param first_batch: Index of the first batch to run, defaults to 0
+    :type first_batch: int, optional
+    :return: Yields the size and result of each batch in order.
+    :rtype: Iterator
+    """
+    starts: range = range(0, num_sims, SIM_BATCH_SIZE)
+    batches: list[tuple[int, int, int, int]] = [
+        (entropy, index, min(SIM_BATCH_SIZE, num_sims - starts[index]), grp_size)
+        for index in range(first_batch, len(starts))
+    ]
+
+    with ProcessPoolExecutor(workers) if workers > 1 else _NoPool() as pool:
+        for batch, result in zip(batches, pool.map(func, batches)):
+            yield batch[2], result
+
+
+def _run_batch(batch: tuple[int, int, int, int]) -> int:
+    """
+    Runs one batch of simulations. Executed in the worker processes.
+
+    :param batch: Master entropy, batch index, batch size and group size.
+    :type batch: tuple[int, int, int, int]
+    :return: Number of simulations in the batch with a match.
+    :rtype: int
+    """
+    entropy, index, num_sims, grp_size = batch
+    rng: np.random.Generator = np.random.default_rng(_batch_seed(entropy, index))
+
+    return count_matches(draw_birthdays(rng, num_sims, grp_size))
+
+
+def _run_sweep_batch(batch: tuple[int, int, int, int]) -> np.ndarray:
+    """
+    Runs one batch of sweep simulations. Executed in the worker processes.
+
+    :param batch: Master entropy, batch index, batch size and group size.
+    :type batch: tuple[int, int, int, int]
+    :return: Count of simulations by the group size of their first match.
+    :rtype: np.ndarray
+    """
+    entropy, index, num_sims, grp_size = batch
+    rng: np.random.Generator = np.random.default_rng(_batch_seed(entropy, index))
+    sizes: np.ndarray = first_match_sizes(draw_birthdays(rng, num_sims, grp_size))
+
+    return np.bincount(sizes, minlength=grp_size + 2)
+
+
+def _batch_seed(entropy: int, index: int) -> np.random.SeedSequence:
+    """
+    Returns the independent seed of a batch. Equivalent to the `index`-th child
+    of `SeedSequence(entropy).spawn()`.
+    """
+    return np.random.SeedSequence(entropy, spawn_key=(index,))
 
-        if sim_count == num_sims:
-            print("\nAll simulations successfully run.\n")
-    return sim_matches
+
+class _NoPool:
+    """Runs `map` in the current process when no worker pool is requested."""
+
+    def __enter__(self) -> "_NoPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def map(self, func, *iterables):
+        return map(func, *iterables)
+
+
+def draw_birthdays(
+    rng: np.random.Generator, num_sims: int, grp_size: int
+) -> np.ndarray:
+    """
+    Draws the birthdays for a batch of simulations as days of the year.
+
+    Birthdays follow the same distribution as `generate_birthdays`: a month is
+    picked at random and then a day within that month.
+
+    :param rng: Random number generator to draw from.
+    :type rng: np.random.Generator
+    :param num_sims: Number of simulations (rows) to draw.
+    :type num_sims: int
+    :param grp_size: Number of people (columns) in each simulation.
+    :type grp_size: int
+    :return: A (num_sims x grp_size) matrix of days numbered 0-364.
+    :rtype: np.ndarray
+    """
+    months: np.ndarray = rng.integers(0, 12, size=(num_sims, grp_size))
+    days: np.ndarray = rng.random((num_sims, grp_size)) * MONTH_LENGTHS[months]
+
+    return (MONTH_STARTS[months] + days.astype(np.int64)).astype(np.uint16)
+
+
+def count_matches(days: np.ndarray) -> int:
+    """
+    Counts the simulations (rows) that contain at least one shared birthday.
+
+    :param days: A (num_sims x grp_size) matrix of days of the year.
+    :type days: np.ndarray
+    :return: Number of rows with a repeated day.
+    :rtype: int
+    """
+    days = np.sort(days, axis=1)
+    repeats: np.ndarray = days[:, 1:] == days[:, :-1]  # Neighbours after sorting
+
+    return int(np.count_nonzero(repeats.any(axis=1)))
+
+
+def first_match_sizes(days: np.ndarray) -> np.ndarray:
+    """
+    Finds how many people each simulation needs before two share a birthday.
+
+    :param days: A (num_sims x grp_size) matrix of days of the year.
+    :type days: np.ndarray
+    :return: Group size of the first match in each row, or grp_size + 1 if the
+        row has no match.
+    :rtype: np.ndarray
+    """
+    num_sims, grp_size = days.shape
+    order: np.ndarray = np.argsort(days, axis=1, kind="stable")
+    days = np.take_along_axis(days, order, axis=1)
+
+    # In a stable sort the later of two equal neighbours is the repeat.
+    repeats: np.ndarray = days[:, 1:] == days[:, :-1]
+    positions: np.ndarray = np.where(repeats, order[:, 1:], grp_size)
+
+    return positions.min(axis=1, initial=grp_size) + 1
 
 
 def get_group_size(rng_grp_size: range, txt_width: int, input_msg: str) -> int:
@@ -133,66 +645,83 @@ def get_group_size(rng_grp_size: range, txt_width: int, input_msg: str) -> int:
     return grp_size
 
 
-def generate_birthdays(numBirthdays: int) -> list[str]:
+def generate_birthdays(numBirthdays: int) -> array:
     """
-    Generates and returns a list of birthdays of a specified length.
+    Generates and returns an array of birthdays of a specified length.
 
     :param numBirthdays: The number of birthdays to be generated
     :type numBirthdays: int
-    :return: A list of birthdays of the following format: 'Nov 1'
-    :rtype: list[str]
+    :return: An array('H') of birthdays as days of the year (0 is Jan 01)
+    :rtype: array
 
     :example:
-    >>> birthdays: list[str] = generate_birthdays(42)
+    >>> birthdays: array = generate_birthdays(42)
         print(birthdays)
     """
-    birthdays: list[str] = []
+    birthdays: array = array("H", bytes(2 * numBirthdays))
 
     for i in range(numBirthdays):
         month: int = random.randint(1, 12)
         last_day: int = month_end_date(month)
 
         day: int = random.randint(1, last_day)
-        birthday: dt.datetime = dt.datetime(year=1900, month=month, day=day)
+        birthdays[i] = int(MONTH_STARTS[month - 1]) + day - 1
 
-        birthdays.append(birthday.strftime("%b %d"))
     return birthdays
 
 
-def display_birthdays(birthdays: list[str]) -> None:
+def format_birthday(day: int) -> str:
+    """
+    Formats a day of the year for display.
+
+    :param day: Day of the year (0 is Jan 01).
+    :type day: int
+    :return: The birthday in the format of 'Nov 01'.
+    :rtype: str
+    """
+    birthday: dt.date = dt.date(year=1900, month=1, day=1) + dt.timedelta(days=day)
+
+    return birthday.strftime("%b %d")
+
+
+def display_birthdays(birthdays: array) -> None:
     """
     Formats and displays birthdays.
 
-    :param birthdays: List of generated birthdays in the format of 'Nov 01'.
-    :type birthdays: list[str]
+    :param birthdays: Array of generated birthdays as days of the year.
+    :type birthdays: array
     """
+    dates: list[str] = [format_birthday(day) for day in birthdays]
 
-    print(f"\nHere are the generated birthdays for a group of {len(birthdays)} people:")
+    print(f"\nHere are the generated birthdays for a group of {len(dates)} people:")
 
-    for index in range(len(birthdays) // 6 + 1):  # Print N rows of 6 dates
+    for index in range(len(dates) // 6 + 1):  # Print N rows of 6 dates
         index = index * 6
         print()
-        ([print(f"{date}", end="    ") for date in birthdays[index : index + 6]])
+        ([print(f"{date}", end="    ") for date in dates[index : index + 6]])
 
-    print() if len(birthdays) % 6 == 0 else print("\n")
+    print() if len(dates) % 6 == 0 else print("\n")
 
 
-def get_match(birthdays: list[str]) -> str | None:
+def get_match(birthdays: array) -> int | None:
     """
-    Returns a datetime object for a birthday that occurs more than once.
+    Returns the first birthday that is repeated in the group.
+
+    Days already seen are tracked as bits of a 366-bit mask, so the group is
+    scanned once.
 
-    :param birthdays: List of generated birthdays in the format of 'Nov 01'.
-    :type birthdays: list[str]
-    :return: Date (i.e. 'Nov 1') of first birthday with a match or None
-    :rtype: str | None
+    :param birthdays: Array of generated birthdays as days of the year.
+    :type birthdays: array
+    :return: Day of the year of the first repeated birthday or None
+    :rtype: int | None
     """
+    seen: int = 0
 
-    if len(birthdays) != len(set(birthdays)):
-        for index, first_date in enumerate(birthdays):
-            for second_date in birthdays[index + 1 :]:
-                if first_date == second_date:
-                    match = first_date
-                    return match
+    for day in birthdays:
+        bit: int = 1 << day
+        if seen & bit:
+            return day
+        seen |= bit
     return None
 
 
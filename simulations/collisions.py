@@ -0,0 +1,308 @@
+"""
+collisions.py, by John Michael Jarvis JMJarvis1@icloud.com
+A generalized version of the birthday paradox simulation. Items are dropped
+into any number of buckets, either uniformly or following a weighted
+distribution (such as real birth-rate data loaded from a CSV file), and the
+simulation counts how often at least k items land in the same bucket.
+"""
+
+import argparse
+import csv
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from birthdayparadox import DAY_PROBABILITIES
+
+SAMPLE_BATCH_ITEMS: int = 2_000_000  # Items drawn per array batch
+
+_sampler: "AliasTable | None" = None  # Sampler used by the worker processes
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    if args.weights is not None:
+        sampler = AliasTable(load_weights_csv(args.weights))
+    elif args.buckets is not None:
+        sampler = AliasTable(np.ones(args.buckets))
+    else:  # Birthday calendar
+        sampler = AliasTable(DAY_PROBABILITIES)
+
+    matches: int = simulate_collisions(
+        args.sims,
+        args.group_size,
+        sampler,
+        k=args.k,
+        seed=args.seed,
+        workers=args.workers,
+    )
+
+    print(
+        f"Out of {args.sims:,} simulations of {args.group_size:,} items in "
+        f"{sampler.num_buckets:,} buckets, {matches:,} had at least {args.k} "
+        f"items in the same bucket. That is a ratio of {matches / args.sims:.4%}."
+    )
+    sys.exit()
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line options for the simulation.
+
+    :return: The parsed options.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description="Generalized collision simulation.")
+    parser.add_argument(
+        "--group-size", type=int, required=True, help="Items dropped per simulation."
+    )
+    buckets = parser.add_mutually_exclusive_group()
+    buckets.add_argument(
+        "--buckets", type=int, default=None, help="Number of equally likely buckets."
+    )
+    buckets.add_argument(
+        "--weights", default=None, help="CSV file with one bucket weight per row."
+    )
+    parser.add_argument(
+        "--k", type=int, default=2, help="Items that must share a bucket."
+    )
+    parser.add_argument(
+        "--sims", type=int, default=100_000, help="Number of simulations to run."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Master seed for reproducible runs."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes to run the simulations on.",
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    for option in ("group_size", "k", "sims", "workers"):
+        if getattr(args, option) < 1:
+            parser.error(f"--{option.replace('_', '-')} must be at least 1")
+    if args.buckets is not None and args.buckets < 1:
+        parser.error("--buckets must be at least 1")
+
+    return args
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table for drawing buckets from a weighted distribution.
+
+    Every draw picks a bucket uniformly and then keeps it or switches to its
+    alias with a precomputed probability, so sampling costs the same two
+    array lookups per item whatever the distribution or number of buckets.
+    """
+
+    def __init__(self, weights: np.ndarray) -> None:
+        """
+        :param weights: Non-negative relative weight of each bucket.
+        :type weights: np.ndarray
+        :raises ValueError: Raised if the weights are negative or all zero.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or weights.size == 0:
+            raise ValueError("An error occurred", "ValueError", "weights must be 1-D")
+        if (weights < 0).any() or not weights.sum() > 0:
+            raise ValueError(
+                "An error occurred", "ValueError", "weights must be non-negative"
+            )
+
+        self.num_buckets: int = weights.size
+        self.uniform: bool = bool((weights == weights[0]).all())
+        self.probability, self.alias = _build_alias_table(weights)
+
+    def sample(self, rng: np.random.Generator, shape: tuple[int, ...]) -> np.ndarray:
+        """
+        Draws buckets from the distribution.
+
+        :param rng: Random number generator to draw from.
+        :type rng: np.random.Generator
+        :param shape: Shape of the array of draws.
+        :type shape: tuple[int, ...]
+        :return: Bucket numbers (0 to num_buckets - 1).
+        :rtype: np.ndarray
+        """
+        dtype = np.int32 if self.num_buckets < 2**31 else np.int64
+        buckets: np.ndarray = rng.integers(0, self.num_buckets, size=shape, dtype=dtype)
+        if self.uniform:
+            return buckets
+
+        keep: np.ndarray = rng.random(shape) < self.probability[buckets]
+
+        return np.where(keep, buckets, self.alias[buckets])
+
+
+def _build_alias_table(weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the keep probabilities and aliases of an alias table.
+
+    Buckets are scaled so the average weight is 1. Instead of pairing one
+    under-full bucket with one over-full bucket at a time, each round lines up
+    the deficits of all under-full buckets against the surpluses of the
+    over-full ones (using cumulative sums) and fills them all at once. An
+    over-full bucket that gives away more than its surplus becomes under-full
+    and is filled in the next round.
+
+    :param weights: Non-negative relative weight of each bucket.
+    :type weights: np.ndarray
+    :return: Probability of keeping each bucket, and each bucket's alias.
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    scaled: np.ndarray = weights * (weights.size / weights.sum())
+    probability: np.ndarray = np.ones(weights.size)
+    alias: np.ndarray = np.arange(weights.size)
+
+    small: np.ndarray = np.flatnonzero(scaled < 1)
+    large: np.ndarray = np.flatnonzero(scaled >= 1)
+    while small.size and large.size:
+        deficits: np.ndarray = 1 - scaled[small]
+        surpluses: np.ndarray = np.cumsum(scaled[large] - 1)
+        starts: np.ndarray = np.cumsum(deficits) - deficits
+
+        # Each under-full bucket takes from the over-full bucket its deficit starts in.
+        donors: np.ndarray = np.searchsorted(surpluses, starts, side="right")
+        donors = np.minimum(donors, large.size - 1)
+
+        probability[small] = scaled[small]
+        alias[small] = large[donors]
+        scaled[large] -= np.bincount(donors, weights=deficits, minlength=large.size)
+
+        small = large[scaled[large] < 1]
+        large = large[scaled[large] >= 1]
+
+    probability[small] = 1.0  # Only rounding error left over
+    return probability, alias
+
+
+def load_weights_csv(path: str) -> np.ndarray:
+    """
+    Loads bucket weights from a CSV file. The weight is taken from the last
+    column of each row, and a header row is skipped.
+
+    :param path: Path to the CSV file.
+    :type path: str
+    :raises ValueError: Raised if a row (other than the header) has no number.
+    :return: The weight of each bucket, in file order.
+    :rtype: np.ndarray
+    """
+    weights: list[float] = []
+    with open(file=path, mode="r", encoding="UTF-8", newline="") as read_file:
+        for line_num, row in enumerate(csv.reader(read_file), start=1):
+            if not row:
+                continue
+            try:
+                weights.append(float(row[-1]))
+            except ValueError:
+                if line_num == 1:
+                    continue  # Header
+                raise ValueError(
+                    "An error occurred", "ValueError", f"{path}:{line_num} = {row}"
+                )
+
+    return np.array(weights)
+
+
+def simulate_collisions(
+    num_sims: int,
+    grp_size: int,
+    sampler: AliasTable,
+    k: int = 2,
+    seed: int | None = None,
+    workers: int = 1,
+) -> int:
+    """
+    Counts the simulations in which at least `k` items land in the same bucket.
+
+    Simulations are run in batches of about `SAMPLE_BATCH_ITEMS` items, each with
+    its own random stream derived from the master seed.
+
+    :param num_sims: The number of iterations to run.
+    :type num_sims: int
+    :param grp_size: Items dropped into the buckets per simulation.
+    :type grp_size: int
+    :param sampler: Distribution of the buckets.
+    :type sampler: AliasTable
+    :param k: Items that must share a bucket, defaults to 2
+    :type k: int, optional
+    :param seed: Master seed for the random streams, defaults to None
+    :type seed: int | None, optional
+    :param workers: Number of worker processes, defaults to 1
+    :type workers: int, optional
+    :return: Number of simulations with a k-way collision.
+    :rtype: int
+    """
+    batch_rows: int = max(1, SAMPLE_BATCH_ITEMS // grp_size)
+    starts: range = range(0, num_sims, batch_rows)
+    seeds: list[np.random.SeedSequence] = np.random.SeedSequence(seed).spawn(
+        len(starts)
+    )
+    batches: list[tuple[np.random.SeedSequence, int, int, int]] = [
+        (batch_seed, min(batch_rows, num_sims - start), grp_size, k)
+        for batch_seed, start in zip(seeds, starts)
+    ]
+
+    _init_worker(sampler)
+    if workers > 1:
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(sampler,)
+        ) as pool:
+            return sum(pool.map(_run_batch, batches))
+    return sum(map(_run_batch, batches))
+
+
+def _init_worker(sampler: AliasTable) -> None:
+    """Stores the sampler once per worker process instead of once per batch."""
+    global _sampler
+    _sampler = sampler
+
+
+def _run_batch(batch: tuple[np.random.SeedSequence, int, int, int]) -> int:
+    """
+    Runs one batch of simulations. Executed in the worker processes.
+
+    :param batch: Seed, batch size, group size and k.
+    :type batch: tuple[np.random.SeedSequence, int, int, int]
+    :return: Number of simulations in the batch with a k-way collision.
+    :rtype: int
+    """
+    batch_seed, num_sims, grp_size, k = batch
+    rng: np.random.Generator = np.random.default_rng(batch_seed)
+    assert _sampler is not None, "_init_worker must run first"
+
+    return count_collisions(_sampler.sample(rng, (num_sims, grp_size)), k)
+
+
+def count_collisions(buckets: np.ndarray, k: int = 2) -> int:
+    """
+    Counts the simulations (rows) where at least `k` items share a bucket.
+
+    After sorting a row, k equal buckets sit next to each other, so the first
+    and last of them are k - 1 places apart.
+
+    :param buckets: A (num_sims x grp_size) matrix of bucket numbers.
+    :type buckets: np.ndarray
+    :param k: Items that must share a bucket, defaults to 2
+    :type k: int, optional
+    :return: Number of rows with a k-way collision.
+    :rtype: int
+    """
+    if k > buckets.shape[1]:
+        return 0
+    if k == 1:
+        return buckets.shape[0]
+
+    buckets = np.sort(buckets, axis=1)
+    repeats: np.ndarray = buckets[:, k - 1 :] == buckets[:, : 1 - k]
+
+    return int(np.count_nonzero(repeats.any(axis=1)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Tests for games/bagels.py."""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "games"))
+
+import bagels
+
+
+class ValidateGuessTest(unittest.TestCase):
+    def test_rejects_strings_int_would_parse(self) -> None:
+        for guess in ("-12", "+12", "1_2", " 12", "12 ", "0x1"):
+            with self.subTest(guess=guess):
+                self.assertFalse(bagels.validate_guess(guess, 3, 10))
+
+    def test_rejects_digits_outside_the_base(self) -> None:
+        self.assertFalse(bagels.validate_guess("12a", 3, 10))
+        self.assertFalse(bagels.validate_guess("128", 3, 8))
+        self.assertTrue(bagels.validate_guess("12a", 3, 16))
+
+    def test_rejects_wrong_length_and_repeats(self) -> None:
+        self.assertFalse(bagels.validate_guess("12", 3, 10))
+        self.assertFalse(bagels.validate_guess("1234", 3, 10))
+        self.assertFalse(bagels.validate_guess("112", 3, 10))
+        self.assertTrue(bagels.validate_guess("123", 3, 10))
+
+    def test_only_valid_guesses_are_scored(self) -> None:
+        for guess in ("-12", "+12", "1_2", " 12"):
+            with self.subTest(guess=guess):
+                self.assertFalse(bagels.validate_guess(guess, 3, 10))
+
+        self.assertTrue(bagels.validate_guess("123", 3, 10))
+        self.assertTrue(bagels.validate_guess("321", 3, 10))
+        self.assertEqual(bagels.get_clue("123", ["1", "2", "4"]), "Fermi Fermi")
+        self.assertEqual(bagels.get_clue("321", ["3", "2", "1"]), "Fermi Fermi Fermi")
+        self.assertEqual(bagels.get_clue("321", ["4", "5", "6"]), "Bagels")
+
+
+if __name__ == "__main__":
+    unittest.main()